@@ -2,28 +2,33 @@ import discord
 from discord.ext import commands
 import os
 import json
+import multiprocessing
+from utils.guilds import allowed_guilds
+from utils.locks import WORKER_ID_ENV, worker_count, shared_mode, is_primary_worker
+from utils.jobs import job_queue
 
 INTENTS = discord.Intents.default()
 INTENTS.message_content = False
 
 OWNER_ID = int(os.getenv("OWNER_ID"))
 BOT_TOKEN = os.getenv("BOT_TOKEN")
-
-ALLOWED_GUILDS = [
-    1431698219892478074,
-    1441231445283704943
-]
+# SHOP_WORKERS=N runs N processes, each one gateway shard, sharing data/ (see utils/locks.py)
+WORKERS = worker_count()
 
 class ShopBot(commands.Bot):
-    def __init__(self):
+    def __init__(self, shard_id=None, shard_count=None):
         super().__init__(
             command_prefix="!",
             intents=INTENTS,
-            application_id=os.getenv("APPLICATION_ID")
+            application_id=os.getenv("APPLICATION_ID"),
+            shard_id=shard_id,
+            shard_count=shard_count
         )
 
     async def setup_hook(self):
-        for guild_id in ALLOWED_GUILDS:
+        # allowed guilds come from data/config.json (see utils/guilds.py)
+        allowed_guilds.reload()
+        for guild_id in allowed_guilds:
             guild = discord.Object(id=guild_id)
             self.tree.copy_global_to(guild=guild)
 
@@ -33,18 +38,71 @@ class ShopBot(commands.Bot):
         await self.load_extension("cogs.cart")
         await self.load_extension("cogs.tickets")
         await self.load_extension("cogs.discounts")
+        await self.load_extension("cogs.sales")
+        await self.load_extension("cogs.backup")
+        await self.load_extension("cogs.diagnostics")
+
+        # Optional: record interactions for offline replay (tools/replay.py)
+        if os.getenv("CAPTURE_INTERACTIONS"):
+            await self.load_extension("cogs.capture")
+
+        # commands belong to the application, so one worker syncing them is enough
+        if is_primary_worker():
+            for guild_id in allowed_guilds:
+                await self.tree.sync(guild=discord.Object(id=guild_id))
+
+        # pick up allow-list edits without a restart (file change or SIGHUP)
+        allowed_guilds.start_watching(self.on_allow_list_change)
+
+        # queued renames/deletes (utils/jobs.py); one runner drains the shared queue
+        if is_primary_worker():
+            job_queue.start(self)
 
-        for guild_id in ALLOWED_GUILDS:
-            await self.tree.sync(guild=discord.Object(id=guild_id))
+    async def on_allow_list_change(self, added, removed):
+        # only newly added guilds need their commands synced
+        for guild_id in added:
+            guild = discord.Object(id=guild_id)
+            self.tree.copy_global_to(guild=guild)
+            if is_primary_worker():
+                await self.tree.sync(guild=guild)
+
+        # get_guild() only finds guilds on this worker's shard; the owning worker leaves the rest
+        for guild_id in removed:
+            guild = self.get_guild(guild_id)
+            if guild is not None:
+                await guild.leave()
 
     async def on_guild_join(self, guild):
-        if guild.id not in ALLOWED_GUILDS:
+        if guild.id not in allowed_guilds:
             await guild.leave()
 
-bot = ShopBot()
+    async def on_ready(self):
+        shard = f" (shard {self.shard_id + 1}/{self.shard_count})" if self.shard_count else ""
+        print(f"Bot logged in as {self.user}{shard}")
+
+
+def run_worker(worker_id: int, workers: int):
+    os.environ[WORKER_ID_ENV] = str(worker_id)
+    ShopBot(shard_id=worker_id, shard_count=workers).run(BOT_TOKEN)
 
-@bot.event
-async def on_ready():
-    print(f"Bot logged in as {bot.user}")
 
-bot.run(BOT_TOKEN)
+if __name__ == "__main__":
+    if shared_mode():
+        # Discord sends all of a guild's interactions to one shard ((guild_id >> 22) % shards),
+        # so only workers whose shard holds an allowed guild ever handle commands
+        busy = {(guild_id >> 22) % WORKERS for guild_id in allowed_guilds}
+        if len(busy) < WORKERS:
+            print(f"{WORKERS} workers but the allowed guilds map to {len(busy)} shard(s); "
+                  f"the other workers will sit idle.")
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(i, WORKERS), name=f"shop-worker-{i}")
+            for i in range(WORKERS)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+    else:
+        if WORKERS > 1:
+            print("Multiple workers need fcntl file locks (Linux/macOS); running a single process.")
+        ShopBot().run(BOT_TOKEN)
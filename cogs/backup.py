@@ -0,0 +1,95 @@
+# cogs/backup.py
+import asyncio
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+from typing import Optional
+
+from utils.locks import is_primary_worker
+from utils.permissions import require_owner
+from utils.snapshots import snapshot_store
+
+# Hours between scheduled snapshots
+BACKUP_INTERVAL_HOURS = 6
+
+
+class Backup(commands.Cog):
+    """Incremental, deduplicated snapshots of the data folder (utils/snapshots.py)."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # one scheduled snapshot is enough when several workers share data/
+        if is_primary_worker():
+            self.scheduled_backup.start()
+
+    async def cog_unload(self):
+        self.scheduled_backup.cancel()
+
+    def describe(self, stats: dict) -> str:
+        return (
+            f"Snapshot `{stats['id']}`: {stats['files']} file(s), {stats['unchanged']} unchanged, "
+            f"{stats['new_chunks']} new chunk(s) / {stats['new_bytes'] / 1024:.1f} KiB stored "
+            f"of {stats['total_bytes'] / 1024:.1f} KiB in {stats['seconds']}s."
+        )
+
+    # ----------------------------
+    # Background: scheduled snapshot
+    # ----------------------------
+    @tasks.loop(hours=BACKUP_INTERVAL_HOURS)
+    async def scheduled_backup(self):
+        try:
+            stats = await asyncio.to_thread(snapshot_store.take)
+            print(self.describe(stats))
+        except Exception as e:
+            print(f"Scheduled backup failed: {e}")
+
+    # ----------------------------
+    # /backup
+    # ----------------------------
+    @app_commands.command(name="backup", description="Take a snapshot of the data folder now (owner only).")
+    @require_owner()
+    async def backup(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        stats = await asyncio.to_thread(snapshot_store.take)
+        await interaction.followup.send(f"💾 {self.describe(stats)}", ephemeral=True)
+
+    # ----------------------------
+    # /backup_list
+    # ----------------------------
+    @app_commands.command(name="backup_list", description="List stored snapshots (owner only).")
+    @require_owner()
+    async def backup_list(self, interaction: discord.Interaction):
+        snapshots = snapshot_store.list_snapshots()
+        if not snapshots:
+            return await interaction.response.send_message("No snapshots yet.", ephemeral=True)
+        recent = "\n".join(f"`{s}`" for s in snapshots[-20:])
+        await interaction.response.send_message(
+            f"💾 {len(snapshots)} snapshot(s), most recent last:\n{recent}",
+            ephemeral=True
+        )
+
+    # ----------------------------
+    # /backup_verify
+    # ----------------------------
+    @app_commands.command(name="backup_verify", description="Check a snapshot's integrity (owner only).")
+    @require_owner()
+    async def backup_verify(self, interaction: discord.Interaction, snapshot_id: Optional[str] = None):
+        """
+        Re-hashes every chunk of the snapshot (the latest one if no id is given).
+        Restoring is done offline with tools/snapshots.py while the bot is stopped.
+        """
+        await interaction.response.defer(ephemeral=True)
+        snapshots = snapshot_store.list_snapshots()
+        snapshot_id = snapshot_id or (snapshots[-1] if snapshots else None)
+        if snapshot_id is None:
+            return await interaction.followup.send("No snapshots yet.", ephemeral=True)
+
+        problems = await asyncio.to_thread(snapshot_store.verify, snapshot_id)
+        if problems:
+            details = "\n".join(problems[:15])
+            return await interaction.followup.send(f"❌ Snapshot `{snapshot_id}` has problems:\n{details}", ephemeral=True)
+        await interaction.followup.send(f"✅ Snapshot `{snapshot_id}` verified.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Backup(bot))
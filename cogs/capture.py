@@ -0,0 +1,83 @@
+# cogs/capture.py
+import os
+import time
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.capture import CaptureWriter, DEFAULT_CAPTURE_FILE, DEFAULT_MAX_BYTES, flatten_options
+
+
+class Capture(commands.Cog):
+    """
+    Records every interaction to a JSONL file for offline replay (tools/replay.py): slash commands
+    once they finish (with their outcome), everything else (buttons, selects, modals) as it arrives.
+    Only loaded when CAPTURE_INTERACTIONS is set; see bot.py.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.writer = CaptureWriter(
+            path=os.getenv("CAPTURE_FILE", DEFAULT_CAPTURE_FILE),
+            max_bytes=int(os.getenv("CAPTURE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+        self._previous_on_error = None
+
+    async def cog_load(self):
+        self.writer.start()
+        # wrap the tree error handler so failed commands are recorded too
+        self._previous_on_error = self.bot.tree.on_error
+        self.bot.tree.on_error = self.on_tree_error
+
+    async def cog_unload(self):
+        if self._previous_on_error is not None:
+            self.bot.tree.on_error = self._previous_on_error
+        await self.writer.stop()
+
+    def entry(self, interaction: discord.Interaction, **fields) -> dict:
+        started = interaction.created_at.timestamp()
+        return {
+            "ts": started,
+            "type": interaction.type.name,
+            **fields,
+            "user_id": interaction.user.id if interaction.user else None,
+            "guild_id": interaction.guild_id,
+            "channel_id": interaction.channel_id,
+            "latency_ms": round((time.time() - started) * 1000, 1),
+        }
+
+    def record(self, interaction: discord.Interaction, command, error: Exception = None):
+        data = interaction.data or {}
+        self.writer.record(self.entry(
+            interaction,
+            command=command.qualified_name if command else data.get("name"),
+            options=flatten_options(data.get("options")),
+            ok=error is None,
+            error=type(error).__name__ if error else None,
+        ))
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # slash commands are recorded when they complete or fail, so the entry carries the outcome
+        if interaction.type == discord.InteractionType.application_command:
+            return
+        data = interaction.data or {}
+        self.writer.record(self.entry(
+            interaction,
+            custom_id=data.get("custom_id"),
+            component_type=data.get("component_type"),
+            values=data.get("values"),
+            message_id=interaction.message.id if interaction.message else None,
+        ))
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.record(interaction, command)
+
+    async def on_tree_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self.record(interaction, interaction.command, error)
+        await self._previous_on_error(interaction, error)
+
+
+async def setup(bot):
+    await bot.add_cog(Capture(bot))
@@ -1,39 +1,117 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+from typing import Optional
+
+from utils.data import load_json
+from utils.carts import get_cart, save_cart, cart_lock, cart_cache, DEFAULT_CACHE_BYTES
+from utils.components import CartButton
+from utils.permissions import is_staff, is_owner, get_config
+from utils.pagination import send_paginated
+from utils.embeds import EmbedTemplate
+from utils.stock import stock_engine, DEFAULT_HOLD_MINUTES
+from utils.pricing import get_pricebook, money
+from utils.models import CartLine, Ticket
+from utils.ledger import ledger
+from utils.events import event_bus, ProductChanged, TicketChanged
 
-from utils.data import load_json, save_json
-from utils.permissions import is_staff, is_owner
-from utils.data import load_json, save_json
-
-CART_FILE = "data/carts.json"
-PRODUCTS_FILE = "data/products.json"
 TICKETS_FILE = "data/tickets.json"
-DISCOUNTS_FILE = "data/discounts.json"
 
+# Cart lines per embed page. Leaves room for the summary fields under Discord's 25-field limit.
+CART_PAGE_SIZE = 10
+
+# Embed skeletons; only the cart lines and totals are filled in per response
+CART_VIEW = EmbedTemplate("🛒 Your Cart", discord.Color.blurple())
+CART_OTHER = EmbedTemplate("🛒 Cart of {user}", discord.Color.gold())
+CART_OTHER_EMPTY = EmbedTemplate("🛒 Cart of {user}", discord.Color.gold(), description="Cart is empty.")
+CHECKOUT = EmbedTemplate("💳 Checkout", discord.Color.green())
 
-def get_cart(user_id):
-    carts = load_json(CART_FILE)
-    return carts.get(str(user_id), {})
 
+def get_ticket(channel_id) -> Optional[Ticket]:
+    data = load_json(TICKETS_FILE).get(str(channel_id))
+    return Ticket.from_dict(data) if data else None
 
-def save_cart(user_id, cart):
-    carts = load_json(CART_FILE)
-    carts[str(user_id)] = cart
-    save_json(CART_FILE, carts)
 
+def format_quantity_line(line: CartLine) -> str:
+    off = f" ({line.percent_off}% off)" if line.percent_off else ""
+    return f"Quantity: **{line.quantity}**\nPrice: **{money(line.unit_cents)}** each{off}"
 
-def get_ticket(channel_id):
-    return load_json(TICKETS_FILE).get(str(channel_id))
 
+def format_checkout_line(line: CartLine) -> str:
+    return f"{line.quantity} × {money(line.unit_cents)} = **{money(line.line_cents)}**"
 
-def get_discount(channel_id):
-    return load_json(DISCOUNTS_FILE).get(str(channel_id), 0)
+
+def discount_label(quote) -> str:
+    label = f"💲 {money(quote.discount)}"
+    if quote.code:
+        label += f" (code `{quote.code}`)"
+    return label
 
 
 class Cart(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        cart_cache.budget_bytes = get_config().cart_cache_bytes or DEFAULT_CACHE_BYTES
+        # channel id -> {product id: last price notice posted there}
+        self.price_notices = {}
+        self.subscription = None
+        self.reservation_sweeper.start()
+
+    async def cog_load(self):
+        self.subscription = event_bus.subscribe("checkout-prices", (ProductChanged, TicketChanged), self.on_catalog_change)
+
+    async def cog_unload(self):
+        self.reservation_sweeper.cancel()
+        stock_engine.flush()
+        if self.subscription:
+            event_bus.unsubscribe(self.subscription)
+
+    # ------------------------------------------------------------
+    # Event subscriber: tell open checkouts about price changes
+    # ------------------------------------------------------------
+    async def on_catalog_change(self, event):
+        """
+        A checkout quotes a total in the ticket; if a product in it is repriced or removed before
+        payment, the ticket gets one notice per change instead of keeping a stale total.
+        """
+        if isinstance(event, TicketChanged):
+            if event.status is None:
+                self.price_notices.pop(str(event.channel_id), None)
+            return
+
+        pid = str(event.product_id)
+        unit = None if event.removed else get_pricebook().units.get(pid)
+        for channel_id, order in ledger.open_orders().items():
+            line = next((l for l in order["lines"] if l[0] == pid), None)
+            if line is None:
+                continue
+            _, name, qty, cents = line
+            if unit is None:
+                note = f"**{name}** is no longer available."
+            elif unit[1] * qty != cents:
+                note = f"**{name}** × {qty} now costs {money(unit[1] * qty)} (was {money(cents)})."
+            else:
+                continue
+
+            seen = self.price_notices.setdefault(channel_id, {})
+            if seen.get(pid) == note:
+                continue
+            seen[pid] = note
+            channel = self.bot.get_channel(int(channel_id))
+            if channel is None:
+                continue
+            try:
+                await channel.send(f"⚠️ {note} Run /cart_checkout again for an updated total.")
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------
+    # Background: expire stale holds and persist stock counters
+    # ------------------------------------------------------------
+    @tasks.loop(seconds=30)
+    async def reservation_sweeper(self):
+        stock_engine.expire()
+        stock_engine.flush()
 
     # ------------------------------------------------------------
     # Utility: Check if command allowed outside ticket
@@ -49,6 +127,25 @@ class Cart(commands.Cog):
 
         return False
 
+    # ------------------------------------------------------------
+    # Utility: paginated cart embed
+    # ------------------------------------------------------------
+    async def send_cart_pages(self, interaction: discord.Interaction, template: EmbedTemplate,
+                              lines: list, line_format, summary: list, ephemeral: bool = False, **values):
+        """
+        Sends a cart as a paginated embed. Lines are formatted once and split into pages of at most
+        CART_PAGE_SIZE lines that also fit Discord's size limits; only the visible page is rendered.
+        The summary fields (totals, payment methods) are repeated on every page.
+        """
+        fields = [(line.name, line_format(line)) for line in lines]
+        pages = template.paginate(fields, summary, max_lines=CART_PAGE_SIZE, **values)
+
+        def render(page: int) -> discord.Embed:
+            start, end = pages[page]
+            return template.render(fields=fields[start:end], summary=summary, **values)
+
+        await send_paginated(interaction, render, len(pages), ephemeral=ephemeral)
+
     # ------------------------------------------------------------
     # /cart view — View your cart
     # ------------------------------------------------------------
@@ -71,37 +168,22 @@ class Cart(commands.Cog):
                 ephemeral=True,
             )
 
-        products = load_json(PRODUCTS_FILE)
-        embed = discord.Embed(
-            title="🛒 Your Cart",
-            color=discord.Color.blurple()
+        # Product, code and ticket discounts are all applied by the price book
+        quote = get_pricebook().quote(cart, get_ticket(interaction.channel.id), interaction.channel.id)
+
+        await self.send_cart_pages(
+            interaction,
+            CART_VIEW,
+            lines=quote.lines,
+            line_format=format_quantity_line,
+            summary=[
+                ("Subtotal", f"💰 {money(quote.subtotal)}"),
+                ("Discount", discount_label(quote)),
+                ("Total", f"✅ {money(quote.total)}"),
+            ],
+            ephemeral=True,
         )
 
-        total = 0
-
-        for product_id, amount in cart.items():
-            product = products.get(product_id)
-            if not product:
-                continue
-
-            embed.add_field(
-                name=product["name"],
-                value=f"Quantity: **{amount}**\nPrice: **{product['price']}** each",
-                inline=False
-            )
-
-            total += product["price"] * amount
-
-        # Apply discount
-        discount = get_discount(interaction.channel.id)
-        final = max(0, total - discount)
-
-        embed.add_field(name="Subtotal", value=f"💰 {total}", inline=False)
-        embed.add_field(name="Discount", value=f"💲 {discount}", inline=False)
-        embed.add_field(name="Total", value=f"✅ {final}", inline=False)
-
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-
     # ------------------------------------------------------------
     # /cart_other — staff view someone else’s cart
     # ------------------------------------------------------------
@@ -112,34 +194,20 @@ class Cart(commands.Cog):
     @app_commands.check(is_staff)
     async def cart_other(self, interaction: discord.Interaction, user: discord.User):
         cart = get_cart(user.id)
-        products = load_json(PRODUCTS_FILE)
-
-        embed = discord.Embed(
-            title=f"🛒 Cart of {user}",
-            color=discord.Color.gold()
-        )
 
         if not cart:
-            embed.description = "Cart is empty."
-            return await interaction.response.send_message(embed=embed)
+            return await interaction.response.send_message(embed=CART_OTHER_EMPTY.render(user=user))
 
-        total = 0
-        for product_id, amount in cart.items():
-            product = products.get(product_id)
-            if not product:
-                continue
+        quote = get_pricebook().quote(cart)
 
-            embed.add_field(
-                name=product["name"],
-                value=f"Quantity: **{amount}**\nPrice: **{product['price']}** each",
-                inline=False
-            )
-
-            total += product["price"] * amount
-
-        embed.add_field(name="Subtotal", value=f"💰 {total}", inline=False)
-
-        await interaction.response.send_message(embed=embed)
+        await self.send_cart_pages(
+            interaction,
+            CART_OTHER,
+            lines=quote.lines,
+            line_format=format_quantity_line,
+            summary=[("Subtotal", f"💰 {money(quote.subtotal)}")],
+            user=user,
+        )
 
     # ------------------------------------------------------------
     # /cart_remove — Remove item by product_id
@@ -155,17 +223,18 @@ class Cart(commands.Cog):
                 ephemeral=True
             )
 
-        cart = get_cart(interaction.user.id)
+        with cart_lock(interaction.user.id):
+            cart = get_cart(interaction.user.id)
+            removed = cart.pop(product_id, None) is not None
+            if removed:
+                save_cart(interaction.user.id, cart)
 
-        if product_id not in cart:
+        if not removed:
             return await interaction.response.send_message(
                 "❌ That product is not in your cart.",
                 ephemeral=True
             )
 
-        del cart[product_id]
-        save_cart(interaction.user.id, cart)
-
         await interaction.response.send_message(
             "🗑 Removed item from your cart.",
             ephemeral=True
@@ -213,7 +282,6 @@ class Cart(commands.Cog):
                 ephemeral=True
             )
 
-        products = load_json(PRODUCTS_FILE)
         ticket = get_ticket(interaction.channel.id)
 
         if not ticket:
@@ -222,45 +290,45 @@ class Cart(commands.Cog):
                 ephemeral=True
             )
 
-        embed = discord.Embed(
-            title="💳 Checkout",
-            color=discord.Color.green()
-        )
-
-        total = 0
-        payment_methods = set()
-
-        for product_id, amount in cart.items():
-            product = products.get(product_id)
-            if not product:
-                continue
-
-            line_total = product["price"] * amount
-            total += line_total
+        book = get_pricebook()
 
-            embed.add_field(
-                name=product["name"],
-                value=f"{amount} × {product['price']} = **{line_total}**",
-                inline=False
+        # Hold the stock for this ticket before quoting a price
+        hold_minutes = get_config().reservation_minutes or DEFAULT_HOLD_MINUTES
+        items = {pid: amount for pid, amount in cart.items() if pid in book.units}
+        ok, shortages = stock_engine.reserve(interaction.channel.id, items, hold_minutes * 60)
+        if not ok:
+            short = "\n".join(
+                f"• **{book.units[pid][0]}** — wanted {wanted}, available {available}"
+                for pid, wanted, available in shortages
             )
-
-            for m in product["payment_methods"]:
-                payment_methods.add(m)
-
-        discount = get_discount(interaction.channel.id)
-        final = max(0, total - discount)
-
-        embed.add_field(name="Subtotal", value=f"💰 {total}", inline=False)
-        embed.add_field(name="Discount", value=f"💲 {discount}", inline=False)
-        embed.add_field(name="Total Due", value=f"✅ {final}", inline=False)
-        embed.add_field(
-            name="Accepted Payments",
-            value="\n".join(payment_methods) or "No methods configured",
-            inline=False
+            return await interaction.response.send_message(
+                f"❌ Not enough stock for:\n{short}",
+                ephemeral=True
+            )
+        expires = int(stock_engine.hold_for(interaction.channel.id)["expires"])
+
+        quote = book.quote(cart, ticket, interaction.channel.id)
+
+        # Snapshot the order; a later checkout in the same ticket supersedes it
+        ledger.record_checkout(interaction.channel.id, ticket.number, ticket.buyer_id, quote)
+
+        await self.send_cart_pages(
+            interaction,
+            CHECKOUT,
+            lines=quote.lines,
+            line_format=format_checkout_line,
+            summary=[
+                ("Subtotal", f"💰 {money(quote.subtotal)}"),
+                ("Discount", discount_label(quote)),
+                ("Total Due", f"✅ {money(quote.total)}"),
+                ("Reserved Until", f"⏳ <t:{expires}:R>"),
+                ("Accepted Payments", "\n".join(quote.payment_methods) or "No methods configured"),
+            ],
+            ephemeral=False,
         )
 
-        await interaction.response.send_message(embed=embed, ephemeral=False)
-
 
 async def setup(bot):
+    # one handler for the add-to-cart buttons on every product message
+    bot.add_dynamic_items(CartButton)
     await bot.add_cog(Cart(bot))
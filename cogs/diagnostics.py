@@ -0,0 +1,54 @@
+# cogs/diagnostics.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.permissions import require_staff
+from utils.carts import cart_cache
+from utils.events import event_bus
+
+
+class Diagnostics(commands.Cog):
+    """Staff views of the bot's in-memory machinery (cart cache, change-event bus)."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ----------------------------
+    # /cart_cache_stats
+    # ----------------------------
+    @app_commands.command(name="cart_cache_stats", description="(Staff) Show cart cache hit rate and memory use.")
+    @require_staff()
+    async def cart_cache_stats(self, interaction: discord.Interaction):
+        stats = cart_cache.stats()
+        embed = discord.Embed(title="🛒 Cart Cache", color=discord.Color.blurple())
+        embed.add_field(name="Resident", value=f"{stats['entries']} carts · {stats['resident_bytes'] / 1024:.1f} KiB", inline=False)
+        embed.add_field(name="Budget", value=f"{stats['budget_bytes'] / 1024:.1f} KiB", inline=False)
+        embed.add_field(
+            name="Hit Rate",
+            value=f"{stats['hit_rate']:.1%} ({stats['hits']} hits / {stats['misses']} misses, {stats['evictions']} evictions)",
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ----------------------------
+    # /event_stats
+    # ----------------------------
+    @app_commands.command(name="event_stats", description="(Staff) Show change events published and how far each subscriber is behind.")
+    @require_staff()
+    async def event_stats(self, interaction: discord.Interaction):
+        stats = event_bus.stats()
+        embed = discord.Embed(title="📣 Event Bus", color=discord.Color.blurple())
+        published = "\n".join(f"{kind}: {count}" for kind, count in sorted(stats["published"].items()))
+        embed.add_field(name="Published", value=published or "Nothing yet", inline=False)
+        for sub in stats["subscribers"]:
+            embed.add_field(
+                name=sub["name"],
+                value=f"{sub['delivered']} handled · {sub['coalesced']} coalesced · {sub['pending']} pending · {sub['failed']} failed",
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -0,0 +1,171 @@
+# cogs/discounts.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Callable, Dict, Optional
+
+from utils.data import load_json, save_json
+from utils.locks import file_lock
+from utils.permissions import require_staff, require_allowed_guild
+from utils.pricing import get_pricebook, invalidate_pricebook, parse_code, money
+from utils.models import Config, Ticket, decode_tickets, encode_tickets, to_cents
+from utils.events import event_bus, TicketChanged
+
+# Files
+TICKETS_FILE = "data/tickets.json"
+CONFIG_FILE = "config.json"   # project-level config (root), holds discount_codes
+
+
+def load_config() -> Config:
+    cfg = load_json(CONFIG_FILE)
+    if not isinstance(cfg, dict):
+        return Config()
+    return Config.from_dict(cfg)
+
+
+def save_config(cfg: Config):
+    save_json(CONFIG_FILE, cfg.to_dict())
+    invalidate_pricebook()
+
+
+def load_tickets() -> Dict[str, Ticket]:
+    return decode_tickets(load_json(TICKETS_FILE))
+
+
+def save_tickets(data: Dict[str, Ticket]):
+    save_json(TICKETS_FILE, encode_tickets(data))
+
+
+def update_ticket(channel_id, change: Callable[[Ticket], None]) -> Optional[Ticket]:
+    """Applies `change` to the channel's ticket under the tickets lock and publishes TicketChanged."""
+    with file_lock("tickets"):
+        tickets = load_tickets()
+        ticket = tickets.get(str(channel_id))
+        if ticket is None:
+            return None
+        change(ticket)
+        save_tickets(tickets)
+    event_bus.emit(TicketChanged(int(channel_id), ticket.status))
+    return ticket
+
+
+def describe_rule(rule) -> str:
+    parsed = parse_code(rule)
+    if not parsed:
+        return "invalid"
+    kind, value = parsed
+    return f"{value}% off" if kind == "percent" else f"{money(value)} off"
+
+
+class Discounts(commands.Cog):
+    """Discount codes and per-ticket discounts. Prices are evaluated by utils.pricing."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ----------------------------
+    # /discount_code_add
+    # ----------------------------
+    @app_commands.command(name="discount_code_add", description="Create or replace a discount code (percent or fixed amount).")
+    @require_allowed_guild()
+    @require_staff()
+    async def discount_code_add(self,
+                                interaction: discord.Interaction,
+                                code: str,
+                                percent: Optional[int] = None,
+                                amount: Optional[float] = None):
+        """
+        Exactly one of percent (0-100) or amount (fixed value off the cart) must be given.
+        """
+        await interaction.response.defer(ephemeral=True)
+        if (percent is None) == (amount is None):
+            return await interaction.followup.send("❌ Give either a percent or an amount.", ephemeral=True)
+        if percent is not None and not 0 <= percent <= 100:
+            return await interaction.followup.send("❌ Discount percent must be between 0 and 100.", ephemeral=True)
+        if amount is not None and amount <= 0:
+            return await interaction.followup.send("❌ Discount amount must be positive.", ephemeral=True)
+
+        code = code.strip().upper()
+        rule = {"percent": int(percent)} if percent is not None else {"amount": round(float(amount), 2)}
+
+        with file_lock("config"):
+            cfg = load_config()
+            cfg.discount_codes[code] = rule
+            save_config(cfg)
+        await interaction.followup.send(f"✅ Code `{code}` saved: {describe_rule(rule)}.", ephemeral=True)
+
+    # ----------------------------
+    # /discount_code_remove
+    # ----------------------------
+    @app_commands.command(name="discount_code_remove", description="Delete a discount code.")
+    @require_allowed_guild()
+    @require_staff()
+    async def discount_code_remove(self, interaction: discord.Interaction, code: str):
+        await interaction.response.defer(ephemeral=True)
+        with file_lock("config"):
+            cfg = load_config()
+            codes = cfg.discount_codes
+            match = next((c for c in codes if c.upper() == code.strip().upper()), None)
+            if match is not None:
+                del codes[match]
+                save_config(cfg)
+        if match is None:
+            return await interaction.followup.send("❌ Code not found.", ephemeral=True)
+        await interaction.followup.send(f"🗑 Removed code `{match}`.", ephemeral=True)
+
+    # ----------------------------
+    # /discount_code_list
+    # ----------------------------
+    @app_commands.command(name="discount_code_list", description="List all discount codes.")
+    @require_allowed_guild()
+    @require_staff()
+    async def discount_code_list(self, interaction: discord.Interaction):
+        codes = load_config().discount_codes
+        if not codes:
+            return await interaction.response.send_message("No discount codes configured.", ephemeral=True)
+
+        lines = [f"`{code}` — {describe_rule(rule)}" for code, rule in sorted(codes.items())]
+        embed = discord.Embed(title="🏷️ Discount Codes", description="\n".join(lines)[:4000], color=discord.Color.gold())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ----------------------------
+    # /discount_apply — buyer applies a code to their ticket
+    # ----------------------------
+    @app_commands.command(name="discount_apply", description="Apply a discount code to this ticket.")
+    @require_allowed_guild()
+    async def discount_apply(self, interaction: discord.Interaction, code: str):
+        await interaction.response.defer(ephemeral=True)
+        code = code.strip().upper()
+        valid = get_pricebook().has_code(code)
+
+        if valid:
+            ticket = update_ticket(interaction.channel.id, lambda t: setattr(t, "discount_code", code))
+        else:
+            ticket = load_tickets().get(str(interaction.channel.id))
+
+        if not ticket:
+            return await interaction.followup.send("❌ You can only use this inside your ticket.", ephemeral=True)
+        if not valid:
+            return await interaction.followup.send("❌ That code is not valid.", ephemeral=True)
+        await interaction.followup.send(f"✅ Code `{code}` applied. Run /cart_checkout to see the new total.", ephemeral=True)
+
+    # ----------------------------
+    # /discount_set — staff sets a fixed discount on this ticket
+    # ----------------------------
+    @app_commands.command(name="discount_set", description="Set a fixed discount amount for this ticket (staff only).")
+    @require_allowed_guild()
+    @require_staff()
+    async def discount_set(self, interaction: discord.Interaction, amount: float):
+        await interaction.response.defer(ephemeral=True)
+        if amount < 0:
+            return await interaction.followup.send("❌ Discount amount cannot be negative.", ephemeral=True)
+
+        ticket = update_ticket(interaction.channel.id, lambda t: setattr(t, "discount_cents", to_cents(amount)))
+
+        if not ticket:
+            return await interaction.followup.send("❌ This channel is not a stored ticket.", ephemeral=True)
+        await interaction.followup.send(f"✅ Ticket discount set to {money(ticket.discount_cents)}.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Discounts(bot))
@@ -1,18 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
+from utils.data import load_json, save_json
+from utils.locks import file_lock
+from utils.models import Config
 
 OWNER_ID = int(os.getenv("OWNER_ID"))
 
-def load_config():
-    with open("config.json", "r") as f:
-        return json.load(f)
+def load_config() -> Config:
+    return Config.from_dict(load_json("config.json"))
 
-def save_config(config):
-    with open("config.json", "w") as f:
-        json.dump(config, f, indent=4)
+def save_config(config: Config):
+    save_json("config.json", config.to_dict())
 
 class Permissions(commands.Cog):
     def __init__(self, bot):
@@ -22,7 +22,7 @@ class Permissions(commands.Cog):
         if user.id == OWNER_ID:
             return True
         config = load_config()
-        staff_ids = config["staff_roles"]
+        staff_ids = config.staff_roles
         return any(role.id in staff_ids for role in user.roles)
 
     async def interaction_check(self, interaction: discord.Interaction):
@@ -33,13 +33,15 @@ class Permissions(commands.Cog):
         description="Adds a role to the staff whitelist."
     )
     async def staff_addrole(self, interaction: discord.Interaction, role: discord.Role):
-        config = load_config()
         if not self.is_staff(interaction.user):
             return await interaction.response.send_message("❌ You cannot use this.", ephemeral=True)
 
-        if role.id not in config["staff_roles"]:
-            config["staff_roles"].append(role.id)
-            save_config(config)
+        # re-read under the lock so another worker's config edit is not overwritten
+        with file_lock("config"):
+            config = load_config()
+            if role.id not in config.staff_roles:
+                config.staff_roles.append(role.id)
+                save_config(config)
 
         await interaction.response.send_message(f"✅ Added {role.mention} as staff.", ephemeral=True)
 
@@ -48,13 +50,14 @@ class Permissions(commands.Cog):
         description="Removes a staff role from whitelist."
     )
     async def staff_removerole(self, interaction: discord.Interaction, role: discord.Role):
-        config = load_config()
         if not self.is_staff(interaction.user):
             return await interaction.response.send_message("❌ You cannot use this.", ephemeral=True)
 
-        if role.id in config["staff_roles"]:
-            config["staff_roles"].remove(role.id)
-            save_config(config)
+        with file_lock("config"):
+            config = load_config()
+            if role.id in config.staff_roles:
+                config.staff_roles.remove(role.id)
+                save_config(config)
 
         await interaction.response.send_message(f"🗑 Removed {role.mention} from staff.", ephemeral=True)
 
@@ -3,37 +3,54 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import os
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Literal, Optional
 from utils.data import load_json, save_json
+from utils.locks import file_signature, shared_mode
 from utils.permissions import require_staff, require_allowed_guild
+from utils.search import product_index
+from utils.stock import stock_engine, products_lock
+from utils.pricing import invalidate_pricebook
+from utils.pagination import send_paginated
+from utils.models import Config, Product, decode_products, encode_products, to_cents
+from utils.catalog_io import detect_format, iter_rows, validate_rows, export_rows
+from utils.components import product_view
+from utils.events import event_bus, ProductChanged
+from utils.jobs import delete_message_later
 
 # Files
 DATA_DIR = "data"
 PRODUCTS_FILE = os.path.join(DATA_DIR, "products.json")
 CONFIG_FILE = "config.json"   # project-level config (root)
+# Search results shown per page
+SEARCH_PAGE_SIZE = 5
+# Bulk import: embeds sent concurrently per batch, and pause between batches (seconds)
+IMPORT_POST_BATCH = 5
+IMPORT_POST_DELAY = 1.0
+# Startup reconciliation: history requests allowed per run, and reposts allowed per run
+RECONCILE_HISTORY_BUDGET = 50
+RECONCILE_REPOST_BUDGET = 25
 # Example local uploaded image path (developer note / for testing)
 LOCAL_EXAMPLE_IMAGE = "/mnt/data/7266CE9E-16F0-4545-B6C7-AD57CC09992.jpeg"
 
 # Helpers for JSON
-def load_products() -> List[dict]:
-    data = load_json(PRODUCTS_FILE)
-    # ensure list format
-    if isinstance(data, dict):
-        # legacy guard: if someone accidentally saved a dict, convert to list
-        return list(data.values())
-    return data or []
-
-def save_products(products: List[dict]):
-    save_json(PRODUCTS_FILE, products)
-
-def load_config() -> dict:
+# every load -> save of products.json runs under products_lock() (the stock engine writes it too)
+def load_products() -> List[Product]:
+    # decode_products also accepts the legacy dict shape and validates every record
+    return decode_products(load_json(PRODUCTS_FILE))
+
+def save_products(products: List[Product]):
+    save_json(PRODUCTS_FILE, encode_products(products))
+    invalidate_pricebook()
+
+def load_config() -> Config:
     cfg = load_json(CONFIG_FILE)
     if not isinstance(cfg, dict):
-        return {}
-    return cfg
+        return Config()
+    return Config.from_dict(cfg)
 
-def save_config(cfg: dict):
-    save_json(CONFIG_FILE, cfg)
+def save_config(cfg: Config):
+    save_json(CONFIG_FILE, cfg.to_dict())
 
 
 class Products(commands.Cog):
@@ -41,23 +58,81 @@ class Products(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.reconcile_task: Optional[asyncio.Task] = None
+        self.subscriptions = []
+        # product id -> embed last posted for it, so unchanged listings are not edited again
+        self.listed: Dict[int, dict] = {}
+
+    async def cog_load(self):
+        self.reconcile_task = asyncio.create_task(self.reconcile_listings())
+        self.subscriptions = [
+            event_bus.subscribe("product-listings", ProductChanged, self.on_product_changed),
+            event_bus.subscribe("search-index", ProductChanged, self.on_product_indexed),
+        ]
+
+    async def cog_unload(self):
+        if self.reconcile_task:
+            self.reconcile_task.cancel()
+        for sub in self.subscriptions:
+            event_bus.unsubscribe(sub)
+
+    def search_index(self):
+        """
+        Returns the shared product index, building it from products.json on first use
+        (and, with several workers, again whenever another worker changed the file).
+        """
+        stale = shared_mode() and product_index.signature != file_signature(PRODUCTS_FILE)
+        if not product_index.loaded or stale:
+            product_index.build(load_products())
+            product_index.signature = file_signature(PRODUCTS_FILE)
+        return product_index
+
+    def find_product(self, product_id: int) -> Optional[Product]:
+        return next((p for p in load_products() if p.id == product_id), None)
+
+    # ----------------------------
+    # Event subscribers (utils/events.py)
+    # ----------------------------
+    async def on_product_changed(self, event: ProductChanged):
+        """Keeps the posted listing in sync with the catalog."""
+        if event.removed:
+            self.listed.pop(event.product_id, None)
+            return
+        product = event.product or self.find_product(event.product_id)
+        if product:
+            await self.try_update_product_message(product)
+
+    async def on_product_indexed(self, event: ProductChanged):
+        index = self.search_index()
+        if event.removed:
+            index.remove(event.product_id)
+            return
+        product = event.product or self.find_product(event.product_id)
+        if product:
+            index.upsert(product)
 
     # ----------------------------
     # Utility: embed generation
     # ----------------------------
-    def product_embed(self, product: dict) -> discord.Embed:
-        title = f"🛍️ {product.get('name', 'Item')}"
+    def product_embed(self, product: Product) -> discord.Embed:
+        title = f"🛍️ {product.name}"
         embed = discord.Embed(title=title, color=discord.Color.blurple())
-        embed.add_field(name="Price", value=f"${float(product.get('price', 0)):.2f}", inline=True)
-        embed.add_field(name="Stock", value=str(product.get("stock", "∞")), inline=True)
-        if product.get("description"):
-            embed.description = product["description"]
-        if product.get("discount_percent", 0):
-            embed.add_field(name="Discount", value=f"{product['discount_percent']}% off", inline=False)
-        if product.get("payment_methods"):
-            embed.add_field(name="Payment methods", value=", ".join(product["payment_methods"]), inline=False)
-        if product.get("image"):
-            embed.set_image(url=product["image"])
+        embed.add_field(name="Price", value=f"${product.price:.2f}", inline=True)
+        embed.add_field(name="Stock", value="∞" if product.stock is None else str(product.stock), inline=True)
+        if product.description:
+            embed.description = product.description
+        if product.discount_percent:
+            embed.add_field(name="Discount", value=f"{product.discount_percent}% off", inline=False)
+        if product.payment_methods:
+            embed.add_field(name="Payment methods", value=", ".join(product.payment_methods), inline=False)
+        if product.image:
+            embed.set_image(url=product.image)
+        return embed
+
+    def listing_embed(self, product: Product) -> discord.Embed:
+        """product_embed() for a message being posted; remembers what the listing shows."""
+        embed = self.product_embed(product)
+        self.listed[product.id] = embed.to_dict()
         return embed
 
     # ----------------------------
@@ -69,7 +144,7 @@ class Products(commands.Cog):
         and return the CDN URL. Otherwise return None.
         """
         cfg = load_config()
-        storage_chan_id = cfg.get("image_storage_channel")
+        storage_chan_id = cfg.image_storage_channel
         if not storage_chan_id:
             return None
 
@@ -117,44 +192,256 @@ class Products(commands.Cog):
             return await interaction.followup.send("❌ You must attach an image file for the product.", ephemeral=True)
 
         products = load_products()
-        new_id = max([p.get("id", 0) for p in products], default=0) + 1
+        new_id = max([p.id for p in products], default=0) + 1
 
         # Try to forward to storage channel for persistent CDN hosting
         saved_url = await self.forward_attachment_to_storage_channel(interaction.guild, image)
         image_url = saved_url or getattr(image, "url", None) or LOCAL_EXAMPLE_IMAGE
 
-        product = {
-            "id": new_id,
-            "name": name,
-            "description": description,
-            "price": round(float(price), 2),
-            "stock": int(stock) if stock is not None else None,
-            "image": image_url,
-            "message_id": None,
-            "channel_id": None,
-            "payment_methods": [],
-            "discount_percent": 0
-        }
-
-        products.append(product)
-        save_products(products)
-
-        # Post product embed to the current channel
-        embed = self.product_embed(product)
+        product = Product(
+            id=new_id,
+            name=name,
+            description=description,
+            price_cents=to_cents(price),
+            stock=int(stock) if stock is not None else None,
+            image=image_url,
+        )
+
+        # Post product embed to the current channel first, so the product is saved in one write
+        sent = None
         try:
-            sent = await interaction.channel.send(embed=embed)
-            # save message & channel ids
-            for p in products:
-                if p["id"] == new_id:
-                    p["message_id"] = sent.id
-                    p["channel_id"] = sent.channel.id
-                    break
-            save_products(products)
+            sent = await interaction.channel.send(embed=self.listing_embed(product), view=product_view(new_id))
+            product.message_id = sent.id
+            product.channel_id = sent.channel.id
         except Exception:
             # ignore sending failure
             pass
 
-        await interaction.followup.send(f"✅ Product **{name}** (id {new_id}) added and posted.", ephemeral=True)
+        # re-read so products added while we were posting are kept
+        posted_id = product.id
+        with products_lock():
+            products = load_products()
+            if any(p.id == product.id for p in products):
+                product.id = max(p.id for p in products) + 1
+            products.append(product)
+            save_products(products)
+            stock_engine.track(product.id, product.stock)
+        if sent is not None and product.id != posted_id:
+            try:
+                await sent.edit(view=product_view(product.id))
+            except Exception:
+                pass
+        await event_bus.publish(ProductChanged(product.id, product))
+
+        await interaction.followup.send(f"✅ Product **{name}** (id {product.id}) added and posted.", ephemeral=True)
+
+    # ----------------------------
+    # Background: check posted product messages still exist
+    # ----------------------------
+    async def scan_channel(self, channel, wanted: set, budget: int):
+        """
+        Pages through the channel history between the oldest and newest wanted message ids
+        (100 messages per request) and returns (found_ids, requests_used, complete).
+        """
+        found = set()
+        requests = 1
+        seen = 0
+        after = discord.Object(id=min(wanted) - 1)
+        before = discord.Object(id=max(wanted) + 1)
+        async for msg in channel.history(limit=None, after=after, before=before, oldest_first=True):
+            seen += 1
+            if seen % 100 == 0:
+                requests += 1
+                if requests > budget:
+                    return found, requests - 1, False
+            if msg.id in wanted:
+                found.add(msg.id)
+                if len(found) == len(wanted):
+                    break
+        return found, requests, True
+
+    async def reconcile_listings(self):
+        """
+        Runs once after startup. Groups products by channel and scans each channel's history in pages
+        instead of fetching every product message. Missing listings are reposted (if `reconcile_repost`
+        is enabled in config.json) or have their message reference cleared. Everything is saved in one write.
+        """
+        await self.bot.wait_until_ready()
+
+        products = load_products()
+        by_channel = {}
+        for p in products:
+            if p.message_id and p.channel_id:
+                by_channel.setdefault(p.channel_id, []).append(p)
+        if not by_channel:
+            return
+
+        budget = RECONCILE_HISTORY_BUDGET
+        missing: List[Product] = []
+        for chid, listed in by_channel.items():
+            channel = self.bot.get_channel(chid)
+            if channel is None:
+                # with several workers the channel may simply belong to another shard
+                if not shared_mode():
+                    missing.extend(listed)
+                continue
+            if budget <= 0:
+                break
+
+            wanted = {p.message_id for p in listed}
+            try:
+                found, used, complete = await self.scan_channel(channel, wanted, budget)
+            except discord.Forbidden:
+                continue
+            except discord.HTTPException:
+                continue
+            budget -= used
+            if not complete:
+                # ran out of budget mid-channel, don't guess about the rest
+                continue
+            missing.extend(p for p in listed if p.message_id not in found)
+
+        if not missing:
+            return
+
+        stale = {p.id: p.message_id for p in missing}
+        reposted = 0
+        if load_config().reconcile_repost:
+            by_target = {}
+            for p in missing[:RECONCILE_REPOST_BUDGET]:
+                channel = self.bot.get_channel(p.channel_id)
+                if channel is not None:
+                    by_target.setdefault(channel, []).append(p)
+            for channel, listed in by_target.items():
+                reposted += await self.post_batched(channel, listed)
+
+        # anything not reposted loses its dead message reference
+        updates = {}
+        for p in missing:
+            if p.message_id == stale[p.id]:
+                updates[p.id] = (None, None)
+            else:
+                updates[p.id] = (p.message_id, p.channel_id)
+
+        # re-read so edits made while we were scanning are kept
+        with products_lock():
+            current = load_products()
+            for p in current:
+                if p.id in updates and p.message_id == stale[p.id]:
+                    p.message_id, p.channel_id = updates[p.id]
+            save_products(current)
+        print(f"Reconciled product listings: {len(missing)} missing, {reposted} reposted")
+
+    # ----------------------------
+    # Utility: post many product embeds
+    # ----------------------------
+    async def post_batched(self, channel: discord.abc.Messageable, products: List[Product]) -> int:
+        """
+        Posts product embeds in small concurrent batches with a pause in between, so large imports
+        stay inside Discord's rate limits. Stores message/channel ids on the products and
+        returns how many were posted. Saving is left to the caller.
+        """
+        posted = 0
+        for start in range(0, len(products), IMPORT_POST_BATCH):
+            batch = products[start:start + IMPORT_POST_BATCH]
+            results = await asyncio.gather(
+                *(channel.send(embed=self.listing_embed(p), view=product_view(p.id)) for p in batch),
+                return_exceptions=True
+            )
+            for product, sent in zip(batch, results):
+                if isinstance(sent, Exception):
+                    continue
+                product.message_id = sent.id
+                product.channel_id = sent.channel.id
+                posted += 1
+            if start + IMPORT_POST_BATCH < len(products):
+                await asyncio.sleep(IMPORT_POST_DELAY)
+        return posted
+
+    # ----------------------------
+    # /product_import
+    # ----------------------------
+    @app_commands.command(name="product_import", description="Bulk import products from a CSV or JSONL attachment.")
+    @require_allowed_guild()
+    @require_staff()
+    async def product_import(self, interaction: discord.Interaction, file: discord.Attachment, post: bool = False):
+        """
+        Columns: name, description, price, stock, image, payment_methods (separated by |), discount_percent.
+        Ids are allocated in one block and the whole batch is saved with a single write.
+        If `post` is set, embeds are posted to this channel afterwards in rate-limited batches.
+        """
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            fmt = detect_format(file.filename)
+        except ValueError as e:
+            return await interaction.followup.send(f"❌ {e}", ephemeral=True)
+
+        data = await file.read()
+        errors: List[str] = []
+        try:
+            with products_lock():
+                products = load_products()
+                first_id = max([p.id for p in products], default=0) + 1
+                imported = list(validate_rows(iter_rows(data, fmt), first_id, errors))
+                if imported:
+                    products.extend(imported)
+                    save_products(products)
+                    for p in imported:
+                        stock_engine.track(p.id, p.stock)
+        except ValueError as e:
+            return await interaction.followup.send(f"❌ {e}", ephemeral=True)
+        if not imported:
+            details = "\n".join(errors[:10])
+            return await interaction.followup.send(f"❌ No valid products found.\n{details}", ephemeral=True)
+
+        posted = 0
+        changed = imported
+        if post:
+            posted = await self.post_batched(interaction.channel, imported)
+            if posted:
+                # posting can take minutes: re-read and only fill in the message ids, so sales,
+                # stock and edits made meanwhile are kept (as reconcile_listings does)
+                listed = {p.id: (p.message_id, p.channel_id) for p in imported if p.message_id}
+                with products_lock():
+                    current = load_products()
+                    for p in current:
+                        if p.id in listed:
+                            p.message_id, p.channel_id = listed[p.id]
+                    save_products(current)
+                latest = {p.id: p for p in current}
+                changed = [latest[p.id] for p in imported if p.id in latest]
+
+        for p in changed:
+            await event_bus.publish(ProductChanged(p.id, p))
+
+        msg = f"✅ Imported **{len(imported)}** product(s) (ids {imported[0].id}–{imported[-1].id})."
+        if post:
+            msg += f" Posted {posted}."
+        if errors:
+            msg += f"\n⚠️ Skipped {len(errors)} invalid row(s):\n" + "\n".join(errors[:10])
+            if len(errors) > 10:
+                msg += f"\n… and {len(errors) - 10} more."
+        await interaction.followup.send(msg[:2000], ephemeral=True)
+
+    # ----------------------------
+    # /product_export
+    # ----------------------------
+    @app_commands.command(name="product_export", description="Export the catalog as a CSV or JSONL file.")
+    @require_allowed_guild()
+    @require_staff()
+    async def product_export(self, interaction: discord.Interaction, fmt: Literal["csv", "jsonl"] = "csv"):
+        await interaction.response.defer(ephemeral=True)
+        products = load_products()
+        if not products:
+            return await interaction.followup.send("No products available.", ephemeral=True)
+
+        fp = export_rows(products, fmt)
+        await interaction.followup.send(
+            f"📦 Exported {len(products)} product(s).",
+            file=discord.File(fp=fp, filename=f"products.{fmt}"),
+            ephemeral=True
+        )
 
     # ----------------------------
     # /product list
@@ -169,10 +456,46 @@ class Products(commands.Cog):
 
         for p in products:
             embed = self.product_embed(p)
-            await interaction.channel.send(embed=embed)
+            await interaction.channel.send(embed=embed, view=product_view(p.id))
 
         await interaction.response.send_message("Posted product list.", ephemeral=True)
 
+    # ----------------------------
+    # /product search
+    # ----------------------------
+    @app_commands.command(name="search", description="Search the catalog by name or description.")
+    @require_allowed_guild()
+    async def search(self, interaction: discord.Interaction, query: str):
+        """
+        Full-text search over product names and descriptions. Partial words match as prefixes,
+        name matches rank above description matches. Results come back as one paginated embed.
+        """
+        index = self.search_index()
+        ranked = index.search(query)
+        if not ranked:
+            return await interaction.response.send_message(f"🔎 No products match **{query}**.", ephemeral=True)
+
+        # the index holds the records it was built from (kept current by the search-index subscriber)
+        results = [index.records[pid] for pid, _ in ranked if pid in index.records]
+        pages = max(1, -(-len(results) // SEARCH_PAGE_SIZE))
+
+        def render(page: int) -> discord.Embed:
+            embed = discord.Embed(
+                title=f"🔎 Results for \"{query}\"",
+                description=f"{len(results)} product(s) found.",
+                color=discord.Color.blurple()
+            )
+            for p in results[page * SEARCH_PAGE_SIZE:(page + 1) * SEARCH_PAGE_SIZE]:
+                stock = "∞" if p.stock is None else p.stock
+                embed.add_field(
+                    name=f"#{p.id} — {p.name}",
+                    value=f"${p.price:.2f} · Stock: {stock}\n{p.description[:150]}".strip(),
+                    inline=False
+                )
+            return embed
+
+        await send_paginated(interaction, render, pages, ephemeral=True)
+
     # ----------------------------
     # /product editstock
     # ----------------------------
@@ -184,17 +507,20 @@ class Products(commands.Cog):
         Change the stored stock for a specific product ID and update its posted embed (if available).
         """
         await interaction.response.defer(ephemeral=True)
-        products = load_products()
-        prod = next((p for p in products if p.get("id") == product_id), None)
+        with products_lock():
+            products = load_products()
+            prod = next((p for p in products if p.id == product_id), None)
+            if prod:
+                prod.stock = int(new_stock)
+                save_products(products)
+                # counters live in the reservation engine; this keeps it in line with the saved value
+                stock_engine.set_stock(product_id, prod.stock)
         if not prod:
             return await interaction.followup.send("❌ Product ID not found.", ephemeral=True)
 
-        prod["stock"] = int(new_stock)
-        save_products(products)
-
-        # try to update posted message
-        await self.try_update_product_message(prod)
-        await interaction.followup.send(f"✅ Updated stock for **{prod['name']}** to {new_stock}.", ephemeral=True)
+        # listing, search index and open checkouts catch up from the event
+        await event_bus.publish(ProductChanged(prod.id, prod))
+        await interaction.followup.send(f"✅ Updated stock for **{prod.name}** to {new_stock}.", ephemeral=True)
 
     # ----------------------------
     # /product remove
@@ -208,25 +534,22 @@ class Products(commands.Cog):
         Option C semantics: this will NOT touch existing carts.
         """
         await interaction.response.defer(ephemeral=True)
-        products = load_products()
-        prod = next((p for p in products if p.get("message_id") == message_id), None)
+        with products_lock():
+            products = load_products()
+            prod = next((p for p in products if p.message_id == message_id), None)
+            if prod:
+                # remove product entry
+                save_products([p for p in products if p.message_id != message_id])
+                stock_engine.forget(prod.id)
         if not prod:
             return await interaction.followup.send("❌ No product found with that message ID.", ephemeral=True)
 
-        # attempt to delete the message
-        ch = interaction.guild.get_channel(prod.get("channel_id")) if prod.get("channel_id") else None
-        if ch:
-            try:
-                msg = await ch.fetch_message(message_id)
-                await msg.delete()
-            except Exception:
-                # ignore deletion errors
-                pass
+        # the listing is deleted in the background (utils/jobs.py), retried if Discord is unavailable
+        if prod.channel_id:
+            delete_message_later(prod.channel_id, message_id)
 
-        # remove product entry
-        new_products = [p for p in products if p.get("message_id") != message_id]
-        save_products(new_products)
-        await interaction.followup.send(f"✅ Removed product **{prod['name']}**. Existing carts were NOT modified.", ephemeral=True)
+        await event_bus.publish(ProductChanged(prod.id, removed=True))
+        await interaction.followup.send(f"✅ Removed product **{prod.name}**. Existing carts were NOT modified.", ephemeral=True)
 
     # ----------------------------
     # /product setpaymentmethods
@@ -239,14 +562,17 @@ class Products(commands.Cog):
         Set payment methods for product. methods is a comma-separated string, e.g. "Tebex,PayPal,CashApp"
         """
         await interaction.response.defer(ephemeral=True)
-        products = load_products()
-        prod = next((p for p in products if p.get("id") == product_id), None)
+        with products_lock():
+            products = load_products()
+            prod = next((p for p in products if p.id == product_id), None)
+            if prod:
+                prod.payment_methods = [m.strip() for m in methods.split(",") if m.strip()]
+                save_products(products)
         if not prod:
             return await interaction.followup.send("❌ Product not found.", ephemeral=True)
 
-        prod["payment_methods"] = [m.strip() for m in methods.split(",") if m.strip()]
-        save_products(products)
-        await interaction.followup.send(f"✅ Payment methods set for **{prod['name']}**: {', '.join(prod['payment_methods'])}", ephemeral=True)
+        await event_bus.publish(ProductChanged(prod.id, prod))
+        await interaction.followup.send(f"✅ Payment methods set for **{prod.name}**: {', '.join(prod.payment_methods)}", ephemeral=True)
 
     # ----------------------------
     # /product setdiscount
@@ -262,28 +588,33 @@ class Products(commands.Cog):
         if percent < 0 or percent > 100:
             return await interaction.followup.send("❌ Discount percent must be between 0 and 100.", ephemeral=True)
 
-        products = load_products()
-        prod = next((p for p in products if p.get("id") == product_id), None)
+        with products_lock():
+            products = load_products()
+            prod = next((p for p in products if p.id == product_id), None)
+            if prod:
+                prod.discount_percent = int(percent)
+                save_products(products)
         if not prod:
             return await interaction.followup.send("❌ Product not found.", ephemeral=True)
 
-        prod["discount_percent"] = int(percent)
-        save_products(products)
-
-        await self.try_update_product_message(prod)
-        await interaction.followup.send(f"✅ Set discount for **{prod['name']}** to {percent}%.", ephemeral=True)
+        await event_bus.publish(ProductChanged(prod.id, prod))
+        await interaction.followup.send(f"✅ Set discount for **{prod.name}** to {percent}%.", ephemeral=True)
 
     # ----------------------------
     # Utility: update posted message
     # ----------------------------
-    async def try_update_product_message(self, product: dict):
+    async def try_update_product_message(self, product: Product):
         """
         If the product has message_id & channel_id, attempt to edit the original message embed to reflect updated stock/discount.
+        Skipped when the listing already shows exactly this embed.
         """
-        mid = product.get("message_id")
-        chid = product.get("channel_id")
+        mid = product.message_id
+        chid = product.channel_id
         if not mid or not chid:
             return
+        embed = self.product_embed(product)
+        if self.listed.get(product.id) == embed.to_dict():
+            return
 
         # find channel in bot guilds
         for g in self.bot.guilds:
@@ -291,9 +622,9 @@ class Products(commands.Cog):
             if ch:
                 try:
                     msg = await ch.fetch_message(mid)
-                    embed = self.product_embed(product)
-                    # If cart cog provides views, it will restore them. Here we only update embed.
-                    await msg.edit(embed=embed)
+                    # re-attach the add-to-cart buttons (older posts may not have them yet)
+                    await msg.edit(embed=embed, view=product_view(product.id))
+                    self.listed[product.id] = embed.to_dict()
                 except Exception:
                     pass
                 return
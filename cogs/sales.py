@@ -0,0 +1,60 @@
+# cogs/sales.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.permissions import require_staff, require_allowed_guild
+from utils.ledger import ledger
+from utils.pricing import money
+
+# How many products are listed in the report
+REPORT_TOP_PRODUCTS = 10
+
+
+class Sales(commands.Cog):
+    """Sales reporting from the order ledger (utils/ledger.py)."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ----------------------------
+    # /sales_report
+    # ----------------------------
+    @app_commands.command(name="sales_report", description="Revenue per day, product and payment method (staff only).")
+    @require_allowed_guild()
+    @require_staff()
+    async def sales_report(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 31] = 7):
+        """
+        Reads the incrementally maintained aggregates; the ledger itself is never rescanned.
+        """
+        report = ledger.report(days)
+        orders = report["orders"]
+
+        embed = discord.Embed(
+            title="📈 Sales Report",
+            description=(
+                f"All-time revenue: **{money(report['revenue'])}**\n"
+                f"Checkouts: {orders.get('checkout', 0)} · Paid: {orders.get('paid', 0)} · "
+                f"Delivered: {orders.get('delivered', 0)} · Abandoned: {orders.get('closed', 0)}"
+            ),
+            color=discord.Color.green()
+        )
+
+        period = sum(cents for _, _, cents in report["per_day"])
+        daily = "\n".join(f"`{day}` {count} order(s) · {money(cents)}" for day, count, cents in report["per_day"])
+        embed.add_field(name=f"Last {days} day(s) — {money(period)}", value=daily[:1024], inline=False)
+
+        top = report["by_product"][:REPORT_TOP_PRODUCTS]
+        if top:
+            value = "\n".join(f"#{pid} **{s['name']}** — {s['units']} sold · {money(s['cents'])}" for pid, s in top)
+            embed.add_field(name="Top products (all time)", value=value[:1024], inline=False)
+
+        if report["by_method"]:
+            value = "\n".join(f"{method}: {money(cents)}" for method, cents in report["by_method"])
+            embed.add_field(name="By payment method (all time)", value=value[:1024], inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Sales(bot))
@@ -4,11 +4,21 @@ from discord.ext import commands
 from discord import app_commands
 import os
 import json
-from typing import Optional
+from typing import Dict, Optional
 
 # Utilities (assumes these helper modules/files exist in your project)
 from utils.permissions import require_staff, require_allowed_guild, require_owner
-from utils.data import load_json, save_json
+from utils.data import load_json, save_json, Transaction
+from utils.locks import file_lock, is_primary_worker
+from utils.carts import cart_path, cart_cache, cart_lock_name
+from utils.pricing import DISCOUNTS_FILE
+from utils.stock import stock_engine
+from utils.models import Config, Ticket, decode_tickets, encode_tickets
+from utils.ledger import ledger
+from utils.embeds import EmbedTemplate
+from utils.events import event_bus, ProductChanged, TicketChanged
+from utils.jobs import rename_channel_later, delete_channel_later
+from utils.payments import PaymentPoller, PaymentStatus, build_provider
 
 # Data files
 TICKETS_FILE = "data/tickets.json"
@@ -28,13 +38,36 @@ for f, default in [
         with open(f, "w", encoding="utf-8") as fh:
             fh.write(default)
 
-
-def load_tickets() -> dict:
-    return load_json(TICKETS_FILE)
-
-
-def save_tickets(data: dict):
-    save_json(TICKETS_FILE, data)
+# Embed skeletons for ticket messages
+TICKET_CREATED = EmbedTemplate(
+    "🛒 Purchase Ticket Created",
+    discord.Color.green(),
+    description=(
+        "Buyer: {buyer}\n"
+        "Ticket Number: **{number}**\n\n"
+        "A staff member will assist you shortly."
+    ),
+    # example image for a nicer embed (non-critical)
+    thumbnail=LOCAL_EXAMPLE_IMAGE,
+)
+TICKET_INFO = EmbedTemplate(
+    "Ticket #{number}",
+    discord.Color.blue(),
+    fields=[
+        ("Buyer ID", "{buyer_id}"),
+        ("Status", "{status}"),
+        ("Delivered", "{delivered}"),
+        ("Discount", "{discount:.2f}"),
+    ],
+)
+
+
+def load_tickets() -> Dict[str, Ticket]:
+    return decode_tickets(load_json(TICKETS_FILE))
+
+
+def save_tickets(data: Dict[str, Ticket]):
+    save_json(TICKETS_FILE, encode_tickets(data))
 
 
 def load_counter() -> dict:
@@ -45,12 +78,12 @@ def save_counter(data: dict):
     save_json(TICKET_COUNTER_FILE, data)
 
 
-def load_config() -> dict:
-    return load_json(CONFIG_FILE)
+def load_config() -> Config:
+    return Config.from_dict(load_json(CONFIG_FILE))
 
 
-def save_config(cfg: dict):
-    save_json(CONFIG_FILE, cfg)
+def save_config(cfg: Config):
+    save_json(CONFIG_FILE, cfg.to_dict())
 
 
 class Tickets(commands.Cog):
@@ -58,42 +91,125 @@ class Tickets(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.payment_poller: Optional[PaymentPoller] = None
+
+    async def cog_load(self):
+        provider = build_provider(load_config())
+        if provider is not None:
+            self.payment_poller = PaymentPoller(provider, self.on_payment_found)
+            # any worker may check on demand; one background poller covers every open ticket
+            if is_primary_worker():
+                self.payment_poller.start()
+
+    async def cog_unload(self):
+        if self.payment_poller:
+            await self.payment_poller.stop()
 
     # -------------------------
     # Helpers
     # -------------------------
+    # read-modify-write helpers hold a file lock so worker processes never interleave
     def next_ticket_number(self) -> int:
-        counter = load_counter()
-        cnt = int(counter.get("count", 0)) + 1
-        counter["count"] = cnt
-        save_counter(counter)
+        with file_lock("ticket_counter"):
+            counter = load_counter()
+            cnt = int(counter.get("count", 0)) + 1
+            counter["count"] = cnt
+            save_counter(counter)
         return cnt
 
     def store_ticket(self, channel: discord.TextChannel, buyer: discord.Member, number: int):
-        tickets = load_tickets()
-        tickets[str(channel.id)] = {
-            "buyer_id": buyer.id,
-            "number": number,
-            "status": "open",
-            "delivered": False,
-            "discount": 0
-        }
-        save_tickets(tickets)
+        with file_lock("tickets"):
+            tickets = load_tickets()
+            tickets[str(channel.id)] = Ticket(buyer_id=buyer.id, number=number)
+            save_tickets(tickets)
+        event_bus.emit(TicketChanged(channel.id, "open"))
 
-    def get_ticket_by_channel(self, channel: discord.TextChannel) -> Optional[dict]:
+    def get_ticket_by_channel(self, channel: discord.TextChannel) -> Optional[Ticket]:
         tickets = load_tickets()
         return tickets.get(str(channel.id))
 
-    def update_ticket(self, channel: discord.TextChannel, data: dict):
-        tickets = load_tickets()
-        tickets[str(channel.id)] = data
-        save_tickets(tickets)
+    def update_ticket(self, channel: discord.TextChannel, data: Ticket):
+        with file_lock("tickets"):
+            tickets = load_tickets()
+            tickets[str(channel.id)] = data
+            save_tickets(tickets)
+        event_bus.emit(TicketChanged(channel.id, data.status))
 
-    def remove_ticket(self, channel: discord.TextChannel):
-        tickets = load_tickets()
-        if str(channel.id) in tickets:
-            del tickets[str(channel.id)]
+    def remove_ticket(self, channel: discord.TextChannel, buyer_id: Optional[int] = None):
+        """
+        Deletes the ticket record, the buyer's cart and the channel's discount entry in one transaction.
+        """
+        key = str(channel.id)
+        locks = ["tickets", "discounts"] + ([cart_lock_name(buyer_id)] if buyer_id is not None else [])
+        with file_lock(*locks), Transaction() as tx:
+            tickets = tx.get(TICKETS_FILE)
+            if tickets.pop(key, None) is not None:
+                tx.put(TICKETS_FILE, tickets)
+
+            if buyer_id is not None:
+                tx.delete(cart_path(buyer_id))
+
+            discounts = tx.get(DISCOUNTS_FILE)
+            if discounts.pop(key, None) is not None:
+                tx.put(DISCOUNTS_FILE, discounts)
+
+        if buyer_id is not None:
+            cart_cache.invalidate(buyer_id)
+        event_bus.emit(TicketChanged(channel.id))
+
+    async def mark_paid(self, channel_id: int, method: Optional[str] = None) -> Optional[str]:
+        """
+        Moves an open ticket to paid: queues the paid-<n> rename, commits its stock reservation and
+        records the sale. Used by /ticket_paid, /ticket_delivered and the payment poller. Returns a
+        (possibly empty) note for the caller, or None when the channel has no open ticket.
+        """
+        with file_lock("tickets"):
+            tickets = load_tickets()
+            ticket = tickets.get(str(channel_id))
+            if ticket is None or ticket.status != "open":
+                if ticket is not None:
+                    # already paid/delivered but a checkout was left open: settle it so the sale is
+                    # recorded and the payment poller stops checking it
+                    self.record_sale(channel_id, method)
+                return None
+            ticket.status = "paid"
             save_tickets(tickets)
+        event_bus.emit(TicketChanged(channel_id, "paid"))
+
+        # rename channel (queued: Discord allows only 2 renames per 10 minutes)
+        rename_channel_later(channel_id, f"paid-{ticket.number}")
+
+        # Take the reserved units out of stock
+        committed = stock_engine.commit(channel_id)
+        note = "" if committed is not None else "\n⚠️ No active stock reservation — adjust stock manually if needed."
+        if committed:
+            # write the new counters now so the listings refreshed from these events show them
+            stock_engine.flush()
+            for pid in committed:
+                await event_bus.publish(ProductChanged(int(pid)))
+
+        if not self.record_sale(channel_id, method):
+            note += "\n⚠️ No checkout on record — this sale will not appear in /sales_report."
+        return note
+
+    def record_sale(self, channel_id: int, method: Optional[str] = None) -> bool:
+        """Records the ticket's last open checkout as paid. False if it has none."""
+        order = ledger.open_order(channel_id)
+        if order is None:
+            return False
+        if method is None and len(order["methods"]) == 1:
+            method = order["methods"][0]
+        ledger.record_status("paid", channel_id, order_id=order["order_id"], method=method)
+        return True
+
+    async def on_payment_found(self, channel_id: int, status: PaymentStatus):
+        """PaymentPoller callback: the provider reports the ticket's order as paid."""
+        note = await self.mark_paid(channel_id, status.method)
+        if note is None:
+            return
+        channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+        reference = f" (reference `{status.reference}`)" if status.reference else ""
+        await channel.send(f"✅ Payment received{reference} — this ticket is now marked **paid**.{note}")
 
     # -------------------------
     # /ticket new
@@ -107,7 +223,7 @@ class Tickets(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         cfg = load_config()
-        category_id = cfg.get("ticket_category")
+        category_id = cfg.ticket_category
         category = None
         if category_id:
             category = interaction.guild.get_channel(category_id)
@@ -125,7 +241,7 @@ class Tickets(commands.Cog):
         }
 
         # Add staff roles if present in config
-        staff_roles = cfg.get("staff_roles", [])
+        staff_roles = cfg.staff_roles
         for rid in staff_roles:
             role = interaction.guild.get_role(rid)
             if role:
@@ -143,17 +259,7 @@ class Tickets(commands.Cog):
 
         # Ping staff roles (if any) and notify buyer
         staff_mentions = " ".join([f"<@&{rid}>" for rid in staff_roles]) if staff_roles else ""
-        embed = discord.Embed(
-            title="🛒 Purchase Ticket Created",
-            description=(
-                f"Buyer: {interaction.user.mention}\n"
-                f"Ticket Number: **{ticket_number}**\n\n"
-                "A staff member will assist you shortly."
-            ),
-            color=discord.Color.green()
-        )
-        # Use example image if available for a nicer embed (non-critical)
-        embed.set_thumbnail(url=LOCAL_EXAMPLE_IMAGE)
+        embed = TICKET_CREATED.render(buyer=interaction.user.mention, number=ticket_number)
 
         await channel.send(content=staff_mentions or None, embed=embed)
         await interaction.followup.send(f"🎫 Ticket created: {channel.mention}", ephemeral=True)
@@ -163,9 +269,10 @@ class Tickets(commands.Cog):
     # -------------------------
     @app_commands.command(name="ticket_paid", description="Mark this ticket as paid (staff only).")
     @require_staff()
-    async def ticket_paid(self, interaction: discord.Interaction):
+    async def ticket_paid(self, interaction: discord.Interaction, method: Optional[str] = None):
         """
-        Staff command to mark the current ticket as paid. Renames channel to paid-<n>.
+        Staff command to mark the current ticket as paid. Queues a rename of the channel to paid-<n>.
+        `method` is the payment method used; if omitted and the order only accepts one, that one is recorded.
         """
         await interaction.response.defer(ephemeral=True)
 
@@ -173,18 +280,10 @@ class Tickets(commands.Cog):
         if not ticket:
             return await interaction.followup.send("❌ This channel is not a stored ticket.", ephemeral=True)
 
-        # rename channel
-        number = ticket.get("number")
-        new_name = f"paid-{number}"
-        try:
-            await interaction.channel.edit(name=new_name)
-        except Exception:
-            pass
-
-        ticket["status"] = "paid"
-        self.update_ticket(interaction.channel, ticket)
-
-        await interaction.followup.send(f"✅ Ticket {number} marked as **paid**.", ephemeral=True)
+        note = await self.mark_paid(interaction.channel.id, method)
+        if note is None:
+            return await interaction.followup.send(f"ℹ️ Ticket {ticket.number} is already marked **{ticket.status}**.", ephemeral=True)
+        await interaction.followup.send(f"✅ Ticket {ticket.number} marked as **paid**.{note}", ephemeral=True)
 
     # -------------------------
     # /ticket_delivered
@@ -193,7 +292,7 @@ class Tickets(commands.Cog):
     @require_staff()
     async def ticket_delivered(self, interaction: discord.Interaction):
         """
-        Staff command to mark ticket delivered. Renames channel to delivered-<n>.
+        Staff command to mark ticket delivered. Queues a rename of the channel to delivered-<n>.
         """
         await interaction.response.defer(ephemeral=True)
 
@@ -201,18 +300,20 @@ class Tickets(commands.Cog):
         if not ticket:
             return await interaction.followup.send("❌ This channel is not a stored ticket.", ephemeral=True)
 
-        number = ticket.get("number")
-        new_name = f"delivered-{number}"
-        try:
-            await interaction.channel.edit(name=new_name)
-        except Exception:
-            pass
+        number = ticket.number
+        # delivering an unpaid ticket settles it first: stock is committed and the sale recorded,
+        # otherwise its checkout would stay open in the ledger (and in the payment poller)
+        note = ""
+        if ticket.status == "open":
+            note = await self.mark_paid(interaction.channel.id) or ""
+        rename_channel_later(interaction.channel.id, f"delivered-{number}")
 
-        ticket["status"] = "delivered"
-        ticket["delivered"] = True
+        ticket.status = "delivered"
+        ticket.delivered = True
         self.update_ticket(interaction.channel, ticket)
+        ledger.record_status("delivered", interaction.channel.id, ticket=number)
 
-        await interaction.followup.send(f"📦 Ticket {number} marked as **delivered**.", ephemeral=True)
+        await interaction.followup.send(f"📦 Ticket {number} marked as **delivered**.{note}", ephemeral=True)
 
     # -------------------------
     # /ticket_setcategory
@@ -224,34 +325,42 @@ class Tickets(commands.Cog):
         Configure the category where tickets will be created.
         """
         await interaction.response.defer(ephemeral=True)
-        cfg = load_config()
-        cfg["ticket_category"] = category.id
-        save_config(cfg)
+        with file_lock("config"):
+            cfg = load_config()
+            cfg.ticket_category = category.id
+            save_config(cfg)
         await interaction.followup.send(f"✅ Ticket category set to **{category.name}**.", ephemeral=True)
 
     # -------------------------
-    # /ticket_checkpayment (placeholder for webhook / auto-detect)
+    # /ticket_checkpayment (on-demand run of the payment poller)
     # -------------------------
-    @app_commands.command(name="ticket_checkpayment", description="(Placeholder) Check external payment status for this ticket.")
+    @app_commands.command(name="ticket_checkpayment", description="Check the payment provider for this ticket now (staff only).")
     @require_staff()
     async def ticket_checkpayment(self, interaction: discord.Interaction):
         """
-        Placeholder command to demonstrate where auto-detection / webhook logic can be hooked.
-        This currently simulates checking an external API or webhook and returns 'no change'.
-        You can later implement a real API check here.
+        Open tickets are polled in the background (utils/payments.py); this checks the current one
+        immediately. A payment found here marks the ticket paid exactly like /ticket_paid.
         """
         await interaction.response.defer(ephemeral=True)
 
         ticket = self.get_ticket_by_channel(interaction.channel)
         if not ticket:
             return await interaction.followup.send("❌ This channel is not a stored ticket.", ephemeral=True)
+        if self.payment_poller is None:
+            return await interaction.followup.send("ℹ️ Payment polling is off — set `payment_provider` in data/config.json.", ephemeral=True)
 
-        # Placeholder: in future, call external API / webhook here
-        # Example: result = webhook_payment_check(ticket_id=ticket['number'])
-        # If result indicates payment, set ticket['status']="paid" and rename the channel
-
-        # Current behavior: no-op
-        await interaction.followup.send("ℹ️ Payment check placeholder executed — no change (manual /webhook integration required).", ephemeral=True)
+        try:
+            status = await self.payment_poller.check_now(interaction.channel.id)
+        except ConnectionError as e:
+            return await interaction.followup.send(f"⚠️ {e} — try again later.", ephemeral=True)
+
+        if status is None:
+            msg = f"ℹ️ Ticket {ticket.number} has no open checkout to check (status: **{ticket.status}**)."
+        elif status.paid:
+            msg = f"✅ Payment found — ticket {ticket.number} marked as **paid**."
+        else:
+            msg = f"⏳ No payment yet for ticket {ticket.number}. It keeps being checked automatically."
+        await interaction.followup.send(msg, ephemeral=True)
 
     # -------------------------
     # /ticket_close
@@ -260,7 +369,7 @@ class Tickets(commands.Cog):
     @require_staff()
     async def ticket_close(self, interaction: discord.Interaction):
         """
-        Closes (deletes) the ticket channel and clears its stored record.
+        Clears the ticket's stored record and queues the channel for deletion.
         """
         await interaction.response.defer(ephemeral=True)
 
@@ -268,13 +377,14 @@ class Tickets(commands.Cog):
         if not ticket:
             return await interaction.followup.send("❌ This channel is not a stored ticket.", ephemeral=True)
 
-        # Remove record then delete channel
-        self.remove_ticket(interaction.channel)
+        # Remove record (with cart and discount), give back any held stock, then delete channel
+        self.remove_ticket(interaction.channel, ticket.buyer_id)
+        stock_engine.release(interaction.channel.id)
+        if ledger.open_order(interaction.channel.id) is not None:
+            # checked out but never paid
+            ledger.record_status("closed", interaction.channel.id, ticket=ticket.number)
         await interaction.followup.send("🗑 Closing ticket...", ephemeral=True)
-        try:
-            await interaction.channel.delete()
-        except Exception:
-            pass
+        delete_channel_later(interaction.channel.id, reason=f"Ticket {ticket.number} closed by {interaction.user}")
 
     # -------------------------
     # Admin: show ticket info
@@ -285,11 +395,15 @@ class Tickets(commands.Cog):
         ticket = self.get_ticket_by_channel(interaction.channel)
         if not ticket:
             return await interaction.response.send_message("❌ This channel is not a ticket.", ephemeral=True)
-        embed = discord.Embed(title=f"Ticket #{ticket.get('number')}", color=discord.Color.blue())
-        embed.add_field(name="Buyer ID", value=str(ticket.get("buyer_id")), inline=False)
-        embed.add_field(name="Status", value=str(ticket.get("status")), inline=False)
-        embed.add_field(name="Delivered", value=str(ticket.get("delivered", False)), inline=False)
-        embed.add_field(name="Discount", value=str(ticket.get("discount", 0)), inline=False)
+        extra = [("Discount Code", ticket.discount_code)] if ticket.discount_code else []
+        embed = TICKET_INFO.render(
+            fields=extra,
+            number=ticket.number,
+            buyer_id=ticket.buyer_id,
+            status=ticket.status,
+            delivered=ticket.delivered,
+            discount=ticket.discount,
+        )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
@@ -0,0 +1,50 @@
+"""
+Checks for utils.embeds.EmbedTemplate: rendered embeds stay within Discord's limits and the
+summary fields survive when the body does not fit.
+
+    python -m pytest -q tests/test_embeds.py
+"""
+import discord
+
+from utils.embeds import EMBED_FIELD_LIMIT, EMBED_TOTAL_LIMIT, FIELD_VALUE_LIMIT, EmbedTemplate
+
+TEMPLATE = EmbedTemplate("🛒 Cart of {user}", discord.Color.gold(), fields=[("Buyer", "{user}")])
+SUMMARY = [("Total", "$12.00"), ("Payment methods", "PayPal, CashApp")]
+
+
+def _names(embed: discord.Embed) -> list:
+    return [field.name for field in embed.fields]
+
+
+def test_summary_kept_when_body_is_too_long():
+    lines = [(f"Item {i}", "x" * FIELD_VALUE_LIMIT) for i in range(10)]
+    embed = TEMPLATE.render(fields=lines, summary=SUMMARY, user="someone")
+
+    assert len(embed) <= EMBED_TOTAL_LIMIT
+    names = _names(embed)
+    assert names[0] == "Buyer"
+    assert names[-2:] == ["Total", "Payment methods"]
+    # the last body field that made it in was clipped to the room left
+    assert embed.fields[-3].value.endswith("…")
+
+
+def test_summary_kept_when_body_has_too_many_fields():
+    lines = [(f"Item {i}", "× 1") for i in range(40)]
+    embed = TEMPLATE.render(fields=lines, summary=SUMMARY, user="someone")
+
+    names = _names(embed)
+    assert len(names) == EMBED_FIELD_LIMIT
+    assert names[1:-2] == [f"Item {i}" for i in range(EMBED_FIELD_LIMIT - 3)]
+    assert names[-2:] == ["Total", "Payment methods"]
+
+
+def test_paginated_pages_render_whole():
+    lines = [(f"Item {i}", "y" * 700) for i in range(30)]
+    pages = TEMPLATE.paginate(lines, SUMMARY, user="someone")
+    assert pages[0][0] == 0 and pages[-1][1] == len(lines)
+
+    for start, end in pages:
+        embed = TEMPLATE.render(fields=lines[start:end], summary=SUMMARY, user="someone")
+        assert len(embed) <= EMBED_TOTAL_LIMIT
+        assert _names(embed) == ["Buyer"] + [f"Item {i}" for i in range(start, end)] + ["Total", "Payment methods"]
+        assert not any(field.value.endswith("…") for field in embed.fields)
@@ -0,0 +1,48 @@
+"""
+Checks for utils.jobs.JobQueue: queued jobs replace pending ones by key, and every job runs
+once even when several runners drain the same SQLite file at the same time.
+
+    python -m pytest -q tests/test_jobs.py
+"""
+import asyncio
+
+from utils.jobs import JobQueue
+
+
+def _queue(path, calls: list) -> JobQueue:
+    queue = JobQueue(str(path))
+
+    @queue.handler("note")
+    async def _note(bot, payload):
+        await asyncio.sleep(0.01)
+        calls.append(payload["n"])
+        return False
+
+    return queue
+
+
+def test_same_key_replaces_pending_job(tmp_path):
+    calls = []
+    queue = _queue(tmp_path / "jobs.sqlite3", calls)
+    queue.enqueue("note", {"n": 1}, key="k")
+    queue.enqueue("note", {"n": 2}, key="k")
+    assert queue.pending() == 1
+
+    asyncio.run(queue.run_due(None))
+    assert calls == [2]
+    assert queue.pending() == 0
+
+
+def test_concurrent_runners_run_each_job_once(tmp_path):
+    calls = []
+    path = tmp_path / "jobs.sqlite3"
+    runners = [_queue(path, calls) for _ in range(3)]
+    for n in range(20):
+        runners[0].enqueue("note", {"n": n}, key=f"job-{n}")
+
+    async def drain():
+        await asyncio.gather(*(runner.run_due(None) for runner in runners))
+
+    asyncio.run(drain())
+    assert sorted(calls) == list(range(20))
+    assert runners[0].pending() == 0
@@ -0,0 +1,52 @@
+"""
+Checks for utils.search.SearchIndex: ranking, prefix matches, and the sorted vocabulary
+staying in step with the postings across incremental updates and rebuilds.
+
+    python -m pytest -q tests/test_search.py
+"""
+from utils.models import Product
+from utils.search import SearchIndex
+
+
+def _product(product_id: int, name: str, description: str = "") -> Product:
+    return Product(id=product_id, name=name, description=description, price_cents=100)
+
+
+def test_name_matches_rank_above_description():
+    index = SearchIndex()
+    index.build([
+        _product(1, "Plain box", "Holds a sword"),
+        _product(2, "Sword", "Sharp"),
+    ])
+    assert [pid for pid, _ in index.search("sword")] == [2, 1]
+    assert [pid for pid, _ in index.search("swo")] == [2, 1]
+    assert index.search("sword sharp")[0][0] == 2
+    assert index.search("axe") == []
+
+
+def test_rebuild_drops_old_tokens():
+    index = SearchIndex()
+    index.build([_product(1, "Golden sword"), _product(2, "Golden shield")])
+    assert len(index.search("golden")) == 2
+
+    # an emptied catalog indexes no token at all, so nothing else marks the cached vocabulary stale
+    index.build([])
+    assert index.search("golden") == []
+    assert index.search("sw") == []
+
+    index.build([_product(3, "Golden shield")])
+    assert index.search("sword") == []
+    assert [pid for pid, _ in index.search("golden")] == [3]
+    assert set(index.records) == {3}
+
+
+def test_remove_and_upsert_update_vocabulary():
+    index = SearchIndex()
+    index.build([_product(1, "Red potion"), _product(2, "Blue potion")])
+    assert len(index.search("potion")) == 2
+
+    index.remove(1)
+    assert index.search("red") == []
+    index.upsert(_product(2, "Blue elixir"))
+    assert index.search("potion") == []
+    assert [pid for pid, _ in index.search("eli")] == [2]
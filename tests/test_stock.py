@@ -0,0 +1,135 @@
+"""
+Oversell checks for utils.stock.StockEngine: many concurrent checkouts against a small stock,
+first from threads of one process, then from several worker processes sharing data/.
+
+    python -m pytest -q tests/test_stock.py
+"""
+import json
+import multiprocessing
+import random
+import threading
+
+import pytest
+
+STOCK = 300
+UNLIMITED_ID = "2"
+
+
+@pytest.fixture
+def shop(tmp_path, monkeypatch):
+    # utils.data creates data/ in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SHOP_WORKERS", raising=False)
+    (tmp_path / "data").mkdir()
+    products = [
+        {"id": 1, "name": "Limited", "price_cents": 100, "stock": STOCK},
+        {"id": 2, "name": "Unlimited", "price_cents": 100, "stock": None},
+    ]
+    (tmp_path / "data" / "products.json").write_text(json.dumps(products))
+    return tmp_path
+
+
+def _engine():
+    from utils.stock import StockEngine
+    return StockEngine("data/products.json", "data/reservations.json")
+
+
+def _checkouts(engine, prefix: str, count: int, seed: int) -> int:
+    """Runs `count` checkouts (reserve, then commit or give up) and returns the units sold."""
+    rng = random.Random(seed)
+    sold = 0
+    for i in range(count):
+        key = f"{prefix}-{i}"
+        qty = rng.randint(1, 3)
+        ok, shortages = engine.reserve(key, {"1": qty, UNLIMITED_ID: 1}, ttl_seconds=60)
+        if not ok:
+            assert shortages and shortages[0][0] == "1"
+            continue
+        if rng.random() < 0.2:
+            # abandoned checkout: the units go back to the pool
+            assert engine.release(key)
+            continue
+        committed = engine.commit(key)
+        assert committed == {"1": qty}
+        sold += qty
+    return sold
+
+
+def _saved_stock() -> int:
+    with open("data/products.json", encoding="utf-8") as f:
+        return next(p["stock"] for p in json.load(f) if p["id"] == 1)
+
+
+def _assert_consistent(engine, sold: int):
+    assert sold <= STOCK
+    assert engine.available("1") == STOCK - sold
+    assert engine.available(UNLIMITED_ID) is None
+    assert engine.holds == {}
+    engine.flush()
+    assert _saved_stock() == STOCK - sold
+
+
+# ------------------------------------------------------------
+# One process, many threads
+# ------------------------------------------------------------
+def test_threads_never_oversell(shop):
+    engine = _engine()
+    results = []
+    lock = threading.Lock()
+
+    def worker(n):
+        sold = _checkouts(engine, f"t{n}", 100, seed=n)
+        with lock:
+            results.append(sold)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    sold = sum(results)
+    # demand (about 5000 units) is far above stock, so everything ends up sold
+    assert sold == STOCK
+    _assert_consistent(engine, sold)
+
+
+def test_release_returns_units(shop):
+    engine = _engine()
+    ok, _ = engine.reserve("a", {"1": STOCK}, ttl_seconds=60)
+    assert ok
+    ok, shortages = engine.reserve("b", {"1": 1}, ttl_seconds=60)
+    assert not ok and shortages == [("1", 1, 0)]
+    assert engine.release("a")
+    assert engine.available("1") == STOCK
+    assert engine.commit("a") is None
+
+
+def test_expired_holds_are_released(shop):
+    engine = _engine()
+    engine.reserve("a", {"1": 10}, ttl_seconds=60)
+    assert engine.expire(now=0) == []
+    assert engine.expire(now=10 ** 12) == ["a"]
+    assert engine.available("1") == STOCK
+
+
+# ------------------------------------------------------------
+# Several worker processes (SHOP_WORKERS)
+# ------------------------------------------------------------
+def _worker_process(worker_id: int) -> int:
+    import os
+    os.environ["SHOP_WORKER_ID"] = str(worker_id)
+    return _checkouts(_engine(), f"w{worker_id}", 150, seed=1000 + worker_id)
+
+
+def test_workers_never_oversell(shop, monkeypatch):
+    from utils.locks import fcntl
+    if fcntl is None:
+        pytest.skip("worker mode needs fcntl")
+    monkeypatch.setenv("SHOP_WORKERS", "4")
+
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        sold = sum(pool.map(_worker_process, range(4)))
+
+    assert sold == STOCK
+    _assert_consistent(_engine(), sold)
@@ -0,0 +1,101 @@
+"""
+Worker scaling through tools/replay.py: a synthetic capture is routed the way the gateway
+would (tools/replay.route, the "fake gateway") and replayed by 1 and then N worker processes
+sharing one data folder, as in bot.py's multi-worker mode.
+
+    python -m pytest -q tests/test_workers.py
+
+Discord delivers every interaction of a guild on one shard, so with guild routing the work
+spreads over at most one worker per guild; the capture below uses several guilds.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import replay  # noqa: E402
+
+WORKERS = 4
+GUILDS = 8
+PRODUCTS = 3000
+SEARCHES = 600
+TICKETS = 40
+WORDS = ["sword", "shield", "potion", "scroll", "amulet", "ring", "bow", "helm"]
+
+
+def _usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _capture() -> list:
+    entries = []
+    for i in range(SEARCHES + TICKETS):
+        guild_id = (i % GUILDS + 1) << 22
+        entry = {"ts": i, "guild_id": guild_id, "channel_id": 1000 + i % GUILDS, "user_id": 5000 + i}
+        if i % ((SEARCHES + TICKETS) // TICKETS) == 0:
+            entry.update(command="ticket_new", options={})
+        else:
+            entry.update(command="search", options={"query": WORDS[i % len(WORDS)][:3 + i % 3]})
+        entries.append(entry)
+    return entries
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    from utils.locks import fcntl
+    if fcntl is None:
+        pytest.skip("worker mode needs fcntl")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OWNER_ID", "1")
+    (tmp_path / "data").mkdir()
+    products = [{
+        "id": i,
+        "name": f"{WORDS[i % len(WORDS)].title()} {i}",
+        "description": f"A {WORDS[(i * 3) % len(WORDS)]} for level {i % 50} with {WORDS[(i * 5) % len(WORDS)]} runes.",
+        "price_cents": 100 + i,
+        "stock": None,
+    } for i in range(1, PRODUCTS + 1)]
+    (tmp_path / "data" / "products.json").write_text(json.dumps(products))
+    return tmp_path
+
+
+def _run(entries, workers: int, workdir) -> float:
+    """Replays `entries` in `workers` processes and returns interactions per second of routed work."""
+    result = replay.replay_parallel(entries, 0, True, workers, "guild", str(workdir))
+    for stats in result["workers"]:
+        assert stats["errors"] == {}
+    assert sum(s["count"] for s in result["workers"]) == len(entries)
+    return len(entries) / max(s["wall"] for s in result["workers"])
+
+
+def _ticket_numbers(workdir) -> list:
+    with open(workdir / "data" / "tickets.json", encoding="utf-8") as f:
+        return sorted(t["number"] for t in json.load(f).values())
+
+
+def test_guild_routing_is_capped_by_guilds():
+    entries = [dict(e, guild_id=1 << 22) for e in _capture()]
+    slices = replay.route(entries, WORKERS, "guild")
+    assert sum(1 for s in slices if s) == 1
+    assert sum(1 for s in replay.route(_capture(), WORKERS, "guild") if s) == WORKERS
+
+
+def test_throughput_grows_with_workers(workdir):
+    entries = _capture()
+    single = _run(entries, 1, workdir)
+    parallel = _run(entries, WORKERS, workdir)
+    print(f"1 worker: {single:.0f}/s, {WORKERS} workers: {parallel:.0f}/s")
+
+    # tickets from every worker share one counter: no number handed out twice
+    numbers = _ticket_numbers(workdir)
+    assert numbers == list(range(1, 2 * TICKETS + 1))
+
+    if _usable_cpus() < 2:
+        pytest.skip(f"one CPU: {WORKERS} workers ran at {parallel / single:.2f}x one worker, no cores to scale onto")
+    assert parallel > single * 1.2
@@ -0,0 +1,125 @@
+"""
+Compares the record types in utils/models.py with the plain dicts and `json.dump(indent=4)`
+they replaced: memory held per record, encode and decode throughput, and file size.
+
+    python tools/bench_models.py [--count 10000] [--repeat 5]
+
+Records are synthetic but shaped like real products.json / tickets.json entries. "dict" is
+the old path (json.load, no validation, json.dump with indent=4); "model" is decode_* with
+validation and the compact encode_* + json.dumps used by save_json.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.models import CartLine, decode_products, decode_tickets, encode_products, encode_tickets  # noqa: E402
+
+
+# ------------------------------------------------------------
+# Sample data (legacy shapes: float prices, indented files)
+# ------------------------------------------------------------
+def legacy_products(count: int) -> list:
+    return [{
+        "id": i,
+        "name": f"Product {i}",
+        "description": f"Description of product {i} with a few more words in it.",
+        "price": round(1 + (i % 5000) / 100, 2),
+        "stock": None if i % 10 == 0 else i % 100,
+        "image": f"https://cdn.discordapp.com/attachments/1/{i}/image.png",
+        "message_id": 10 ** 17 + i,
+        "channel_id": 10 ** 17,
+        "payment_methods": ["PayPal", "CashApp"],
+        "discount_percent": i % 30,
+    } for i in range(1, count + 1)]
+
+
+def legacy_tickets(count: int) -> dict:
+    return {str(10 ** 17 + i): {
+        "buyer_id": 10 ** 17 + i * 7,
+        "number": i,
+        "status": ("open", "paid", "delivered")[i % 3],
+        "delivered": i % 3 == 2,
+        "discount": round((i % 10) * 1.5, 2),
+    } for i in range(1, count + 1)}
+
+
+# ------------------------------------------------------------
+# Measurements
+# ------------------------------------------------------------
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_bytes(build) -> int:
+    """Memory still allocated by the object build() returns, once its temporaries are gone."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def dump_indented(data) -> str:
+    buf = io.StringIO()
+    json.dump(data, buf, indent=4)
+    return buf.getvalue()
+
+
+def compare(name: str, legacy, decode, encode, count: int, repeat: int):
+    legacy_text = dump_indented(legacy)
+    records = decode(json.loads(legacy_text))
+    compact_text = json.dumps(encode(records), separators=(",", ":"))
+
+    rows = [
+        ("memory / record (B)",
+         retained_bytes(lambda: json.loads(legacy_text)) / count,
+         retained_bytes(lambda: decode(json.loads(compact_text))) / count),
+        ("decode (records/s)",
+         count / best_of(repeat, lambda: json.loads(legacy_text)),
+         count / best_of(repeat, lambda: decode(json.loads(compact_text)))),
+        ("encode (records/s)",
+         count / best_of(repeat, lambda: dump_indented(legacy)),
+         count / best_of(repeat, lambda: json.dumps(encode(records), separators=(",", ":")))),
+        ("file size (B / record)",
+         len(legacy_text.encode("utf-8")) / count,
+         len(compact_text.encode("utf-8")) / count),
+    ]
+    print(f"\n{name} ({count} records)")
+    print(f"  {'':24}{'dict':>14}{'model':>14}{'ratio':>8}")
+    for label, old, new in rows:
+        print(f"  {label:24}{old:>14,.0f}{new:>14,.0f}{new / old:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark utils.models against plain dicts.")
+    parser.add_argument("--count", type=int, default=10000, help="records per collection")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    args = parser.parse_args()
+
+    compare("Products", legacy_products(args.count), decode_products, encode_products, args.count, args.repeat)
+    compare("Tickets", legacy_tickets(args.count), decode_tickets, encode_tickets, args.count, args.repeat)
+
+    # cart lines are built by pricing, never stored, so only their footprint matters
+    line = {"product_id": "1", "name": "Product 1", "quantity": 2, "unit_cents": 499, "percent_off": 0}
+    as_dict = retained_bytes(lambda: [dict(line) for _ in range(args.count)]) / args.count
+    as_model = retained_bytes(lambda: [CartLine(**line) for _ in range(args.count)]) / args.count
+    print(f"\nCart lines: {as_dict:,.0f} B/record as dict, {as_model:,.0f} B/record as CartLine")
+
+
+if __name__ == "__main__":
+    main()
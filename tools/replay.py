@@ -0,0 +1,457 @@
+"""
+Replays a capture recorded by cogs/capture.py against the cogs, without connecting to Discord.
+
+    python tools/replay.py data/requests.jsonl                # original pacing (1x)
+    python tools/replay.py data/requests.jsonl --speed 10     # 10x faster
+    python tools/replay.py data/requests.jsonl --speed 0      # as fast as possible
+    python tools/replay.py data/requests.jsonl --speed 0 --workers 4   # 4 worker processes
+
+Commands run inside a scratch directory (seeded from --seed, e.g. a copy of the live
+project root), so live data files are never touched. Prints throughput and latency percentiles.
+Slash commands and clicks on persistent components (dynamic items such as the cart buttons)
+are replayed; clicks on views that only lived in the original process (e.g. pagination) and
+other interaction types are counted as failures.
+With --workers the capture is split the way the gateway would route it (by guild shard, or by
+user to model a gateway feeding handler processes) and replayed by that many processes
+sharing one scratch data folder, as in bot.py's multi-worker mode.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COGS = [
+    "cogs.permissions",
+    "cogs.products",
+    "cogs.cart",
+    "cogs.tickets",
+    "cogs.discounts",
+    "cogs.sales",
+    "cogs.backup",
+    "cogs.diagnostics",
+]
+
+_snowflakes = itertools.count(1 << 60)
+
+
+# ------------------------------------------------------------
+# Fake Discord objects (only what the cogs actually touch)
+# ------------------------------------------------------------
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.name = f"role-{role_id}"
+        self.mention = f"<@&{role_id}>"
+
+
+class FakeMember:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user-{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.roles = []
+
+    def __str__(self):
+        return self.name
+
+
+class FakeAttachment:
+    def __init__(self, attachment_id):
+        self.id = attachment_id
+        self.filename = f"attachment-{attachment_id}.png"
+        self.url = f"https://cdn.invalid/{self.filename}"
+
+    async def read(self):
+        return b""
+
+
+class FakeMessage:
+    def __init__(self, channel, **kwargs):
+        self.id = next(_snowflakes)
+        self.channel = channel
+        self.attachments = []
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs):
+        self.kwargs.update(kwargs)
+
+    async def delete(self):
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    def __init__(self, guild, channel_id: int, name: str = None):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name or f"channel-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+        self.messages = {}
+
+    async def send(self, content=None, **kwargs):
+        msg = FakeMessage(self, content=content, **kwargs)
+        self.messages[msg.id] = msg
+        return msg
+
+    async def fetch_message(self, message_id):
+        msg = self.messages.get(message_id)
+        if msg is None:
+            raise LookupError("unknown message")
+        return msg
+
+    async def edit(self, **kwargs):
+        self.name = kwargs.get("name", self.name)
+
+    async def delete(self, **kwargs):
+        self.guild.channels.pop(self.id, None)
+
+    async def history(self, **kwargs):
+        for msg in list(self.messages.values()):
+            yield msg
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.default_role = FakeRole(guild_id)
+        self.channels = {}
+
+    def channel(self, channel_id: int) -> FakeChannel:
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id)
+        return self.channels[channel_id]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return FakeRole(role_id)
+
+    async def create_text_channel(self, name, **kwargs):
+        ch = FakeChannel(self, next(_snowflakes), name)
+        self.channels[ch.id] = ch
+        return ch
+
+    async def leave(self):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        self.interaction.sent.append(await self.interaction.channel.send(content, **kwargs))
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        kwargs.pop("wait", None)
+        msg = await self.interaction.channel.send(content, **kwargs)
+        self.interaction.sent.append(msg)
+        return msg
+
+
+class FakeInteraction:
+    def __init__(self, entry: dict, guild: FakeGuild, user: FakeMember):
+        self.id = next(_snowflakes)
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = guild.channel(entry.get("channel_id") or 0)
+        self.channel_id = self.channel.id
+        self.created_at = datetime.now(timezone.utc)
+        if entry.get("type") == "component":
+            self.data = {"custom_id": entry.get("custom_id"), "component_type": entry.get("component_type"),
+                         "values": entry.get("values") or []}
+        else:
+            self.data = {"name": entry.get("command"), "options": []}
+        self.message = None
+        self.command = None
+        self.sent = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def original_response(self):
+        return self.sent[-1] if self.sent else None
+
+
+# ------------------------------------------------------------
+# Replay
+# ------------------------------------------------------------
+class Replayer:
+    def __init__(self, bot, skip_checks: bool):
+        from discord import AppCommandOptionType
+        self.bot = bot
+        self.skip_checks = skip_checks
+        self.option_types = AppCommandOptionType
+        self.guilds = {}
+        self.members = {}
+
+    def guild(self, guild_id) -> FakeGuild:
+        guild_id = guild_id or 0
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = FakeGuild(guild_id)
+        return self.guilds[guild_id]
+
+    def member(self, user_id) -> FakeMember:
+        user_id = user_id or 0
+        if user_id not in self.members:
+            self.members[user_id] = FakeMember(user_id)
+        return self.members[user_id]
+
+    def convert(self, param, value, guild: FakeGuild):
+        t = self.option_types
+        if value is None:
+            return None
+        if param.type in (t.user, t.mentionable):
+            return self.member(int(value))
+        if param.type == t.role:
+            return FakeRole(int(value))
+        if param.type == t.channel:
+            return guild.channel(int(value))
+        if param.type == t.attachment:
+            return FakeAttachment(value)
+        return value
+
+    async def run(self, entry: dict):
+        """Runs one captured interaction. Returns (ok, error_name)."""
+        kind = entry.get("type", "application_command")   # older captures only hold commands
+        if kind == "component":
+            return await self.run_component(entry)
+        if kind != "application_command":
+            return False, "UnsupportedInteraction"
+
+        command = self.bot.tree.get_command(entry.get("command") or "")
+        if command is None:
+            return False, "UnknownCommand"
+
+        guild = self.guild(entry.get("guild_id"))
+        interaction = FakeInteraction(entry, guild, self.member(entry.get("user_id")))
+        interaction.command = command
+
+        options = entry.get("options") or {}
+        kwargs = {}
+        for param in command.parameters:
+            if param.name in options:
+                kwargs[param.name] = self.convert(param, options[param.name], guild)
+            elif not param.required:
+                kwargs[param.name] = param.default
+
+        try:
+            if not self.skip_checks:
+                for check in command.checks:
+                    if not await check(interaction):
+                        return False, "CheckFailure"
+            await command.callback(command.binding, interaction, **kwargs)
+        except Exception as e:
+            return False, type(e).__name__
+        return True, None
+
+    def dynamic_item(self, custom_id: str):
+        # classes the cogs registered with bot.add_dynamic_items(), keyed by compiled template
+        for pattern, item in self.bot._connection._view_store._dynamic_items.items():
+            match = pattern.fullmatch(custom_id)
+            if match is not None:
+                return item, match
+        return None, None
+
+    async def run_component(self, entry: dict):
+        """Runs one captured button/select click on a persistent dynamic item."""
+        item_cls, match = self.dynamic_item(entry.get("custom_id") or "")
+        if item_cls is None:
+            return False, "UnknownComponent"
+
+        interaction = FakeInteraction(entry, self.guild(entry.get("guild_id")), self.member(entry.get("user_id")))
+        try:
+            item = await item_cls.from_custom_id(interaction, None, match)
+            if not self.skip_checks and not await item.interaction_check(interaction):
+                return False, "CheckFailure"
+            await item.callback(interaction)
+        except Exception as e:
+            return False, type(e).__name__
+        return True, None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+async def replay(entries, speed: float, skip_checks: bool, label: str = "Replayed") -> dict:
+    """Replays `entries` in this process. Returns {"count", "wall", "errors"}."""
+    import discord
+    from discord.ext import commands
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    for ext in COGS:
+        await bot.load_extension(ext)
+
+    replayer = Replayer(bot, skip_checks)
+    latencies = []
+    errors = {}
+
+    async def timed(entry):
+        started = time.perf_counter()
+        ok, error = await replayer.run(entry)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not ok:
+            errors[error] = errors.get(error, 0) + 1
+
+    t0 = entries[0].get("ts", 0)
+    wall_start = time.perf_counter()
+    tasks = []
+    for entry in entries:
+        if speed > 0:
+            due = (entry.get("ts", t0) - t0) / speed
+            delay = due - (time.perf_counter() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(timed(entry)))
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall_start
+
+    for ext in COGS:
+        await bot.unload_extension(ext)
+
+    latencies.sort()
+    print(f"{label} {len(entries)} interactions in {wall:.2f}s "
+          f"({len(entries) / wall if wall else float('inf'):.1f}/s, speed={'unlimited' if speed <= 0 else f'{speed:g}x'})")
+    print(f"Latency ms  p50={percentile(latencies, 50):.2f}  p95={percentile(latencies, 95):.2f}  "
+          f"p99={percentile(latencies, 99):.2f}  max={latencies[-1] if latencies else 0:.2f}")
+    if errors:
+        print("Failures: " + ", ".join(f"{name}={count}" for name, count in sorted(errors.items())))
+    return {"count": len(entries), "wall": wall, "errors": errors}
+
+
+def load_capture(path):
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    entries.sort(key=lambda e: e.get("ts", 0))
+    return entries
+
+
+def route(entries, workers: int, by: str):
+    """Splits entries per worker like Discord shards guilds ((guild_id >> 22) % n), or by user."""
+    slices = [[] for _ in range(workers)]
+    for entry in entries:
+        if by == "user":
+            slot = (entry.get("user_id") or 0) % workers
+        else:
+            slot = ((entry.get("guild_id") or 0) >> 22) % workers
+        slices[slot].append(entry)
+    return slices
+
+
+def replay_worker(worker_id: int, workers: int, workdir: str, entries, speed: float, skip_checks: bool,
+                  results=None):
+    from utils.locks import WORKERS_ENV, WORKER_ID_ENV
+    global _snowflakes
+    os.chdir(workdir)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault("OWNER_ID", "0")
+    os.environ[WORKERS_ENV] = str(workers)
+    os.environ[WORKER_ID_ENV] = str(worker_id)
+    # keep ids of channels/messages created by different workers apart
+    _snowflakes = itertools.count((1 << 60) + (worker_id << 48))
+    stats = asyncio.run(replay(entries, speed, skip_checks, label=f"[worker {worker_id}] replayed"))
+    if results is not None:
+        results.put(dict(stats, worker=worker_id))
+
+
+def replay_parallel(entries, speed: float, skip_checks: bool, workers: int, by: str, workdir: str) -> dict:
+    """
+    Replays in `workers` processes. Returns {"wall", "workers": [per-worker stats]}; a worker's
+    "wall" excludes its startup, so max() of them is the time the routed work itself took.
+    Routing by guild can keep at most one worker busy per guild (Discord delivers all of a
+    guild's interactions on one shard).
+    """
+    slices = route(entries, workers, by)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=replay_worker, args=(i, workers, workdir, chunk, speed, skip_checks, results))
+        for i, chunk in enumerate(slices) if chunk
+    ]
+    started = time.perf_counter()
+    for p in processes:
+        p.start()
+    stats = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    wall = time.perf_counter() - started
+    print(f"{len(processes)} worker(s) (routed by {by}, sizes {[len(s) for s in slices]}): "
+          f"{len(entries)} interactions in {wall:.2f}s ({len(entries) / wall if wall else float('inf'):.1f}/s overall)")
+    return {"wall": wall, "workers": sorted(stats, key=lambda s: s["worker"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured interaction log against the cogs.")
+    parser.add_argument("capture", help="JSONL file written by cogs/capture.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = original pacing, 10 = 10x, 0 = unlimited")
+    parser.add_argument("--seed", help="directory with config.json and data/ to start from")
+    parser.add_argument("--skip-checks", action="store_true", help="ignore staff/guild checks")
+    parser.add_argument("--workers", type=int, default=1, help="replay in N processes sharing one data folder")
+    parser.add_argument("--route", choices=["guild", "user"], default="guild",
+                        help="how --workers splits the capture (guild = gateway shards)")
+    args = parser.parse_args()
+
+    entries = load_capture(os.path.abspath(args.capture))
+    if not entries:
+        print("Capture is empty.")
+        return
+
+    workdir = tempfile.mkdtemp(prefix="replay-")
+    if args.seed:
+        seed = os.path.abspath(args.seed)
+        if os.path.exists(os.path.join(seed, "config.json")):
+            shutil.copy(os.path.join(seed, "config.json"), workdir)
+        if os.path.isdir(os.path.join(seed, "data")):
+            shutil.copytree(os.path.join(seed, "data"), os.path.join(workdir, "data"))
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+
+    # the cogs use paths relative to the working directory
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("OWNER_ID", "0")
+
+    try:
+        if args.workers > 1:
+            replay_parallel(entries, args.speed, args.skip_checks, args.workers, args.route, workdir)
+        else:
+            asyncio.run(replay(entries, args.speed, args.skip_checks))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Offline access to the snapshot store written by /backup (utils/snapshots.py).
+
+    python tools/snapshots.py list
+    python tools/snapshots.py verify [SNAPSHOT_ID]
+    python tools/snapshots.py restore SNAPSHOT_ID TARGET_DIR
+
+Run from the bot's working directory with the bot stopped. Restore into an empty
+directory and swap it in for data/ once you are happy with it.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.snapshots import SnapshotStore, SNAPSHOT_DIR  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, verify or restore data snapshots.")
+    parser.add_argument("--store", default=SNAPSHOT_DIR, help="snapshot store directory")
+    sub = parser.add_subparsers(dest="action", required=True)
+    sub.add_parser("list")
+    verify = sub.add_parser("verify")
+    verify.add_argument("snapshot_id", nargs="?")
+    restore = sub.add_parser("restore")
+    restore.add_argument("snapshot_id")
+    restore.add_argument("target")
+    args = parser.parse_args()
+
+    store = SnapshotStore(root=args.store)
+    snapshots = store.list_snapshots()
+
+    if args.action == "list":
+        for snapshot_id in snapshots:
+            manifest = store.load_manifest(snapshot_id)
+            size = sum(f["size"] for f in manifest["files"].values())
+            print(f"{snapshot_id}  {len(manifest['files'])} files  {size / 1024:.1f} KiB")
+        return
+
+    if args.action == "verify":
+        snapshot_id = args.snapshot_id or (snapshots[-1] if snapshots else None)
+        if snapshot_id is None:
+            sys.exit("No snapshots.")
+        problems = store.verify(snapshot_id)
+        for problem in problems:
+            print(problem)
+        print(f"{snapshot_id}: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+        sys.exit(1 if problems else 0)
+
+    if args.action == "restore":
+        if os.path.exists(args.target) and os.listdir(args.target):
+            sys.exit(f"{args.target} is not empty; restore into an empty directory.")
+        store.restore(args.snapshot_id, args.target)
+        print(f"Restored {args.snapshot_id} into {args.target}")
+
+
+if __name__ == "__main__":
+    main()
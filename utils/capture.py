@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import List, Optional
+
+# Defaults for the interaction recorder (see cogs/capture.py)
+DEFAULT_CAPTURE_FILE = "data/requests.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+
+# ------------------------------------------------------------
+# Buffered JSONL writer with size-based rotation
+# ------------------------------------------------------------
+class CaptureWriter:
+    """
+    record() only appends to an in-memory buffer, so it never blocks the event loop.
+    A background task drains the buffer every `flush_interval` seconds and writes the batch
+    from a worker thread. When the file would grow past `max_bytes` it is rotated to
+    file.1, file.2, ... keeping `backups` old files.
+    If the buffer fills up faster than it can be written, the oldest entries are dropped.
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CAPTURE_FILE,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS,
+                 flush_interval: float = 1.0,
+                 max_buffer: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=max_buffer)
+        self.dropped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, entry: dict):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(json.dumps(entry, separators=(",", ":"), default=str))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Capture flush failed: {e}")
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        lines = []
+        while self.buffer:
+            lines.append(self.buffer.popleft())
+        await asyncio.to_thread(self._write, lines)
+
+    # ----------------------------
+    # File handling (runs in a worker thread)
+    # ----------------------------
+    def _write(self, lines: List[str]):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        payload = "\n".join(lines) + "\n"
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size and size + len(payload) > self.max_bytes:
+            self._rotate()
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(payload)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def flatten_options(options: Optional[list]) -> dict:
+    """
+    Turns interaction option payloads into {name: value}. Subcommand groups are
+    flattened with their name as a prefix.
+    """
+    out = {}
+    for opt in options or []:
+        if "options" in opt:
+            for key, value in flatten_options(opt["options"]).items():
+                out[f"{opt['name']}.{key}"] = value
+        else:
+            out[opt["name"]] = opt.get("value")
+    return out
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from utils.data import load_json, save_json
+from utils.locks import file_lock, file_signature, shared_mode
+from utils.models import decode_cart
+
+# One small file per buyer; only recently used carts are kept in memory
+CART_DIR = "data/carts"
+# Single-file layout used before per-user segments, migrated on first use
+LEGACY_CART_FILE = "data/carts.json"
+DEFAULT_CACHE_BYTES = 1024 * 1024
+# Cart locks are striped: buyers share this many lock files, so fds and files stay bounded
+CART_LOCK_STRIPES = 64
+# Rough per-entry overhead of the dict/OrderedDict bookkeeping
+ENTRY_OVERHEAD = 120
+
+
+def cart_path(user_id) -> str:
+    return os.path.join(CART_DIR, f"{int(user_id)}.json")
+
+
+def cart_lock_name(user_id) -> str:
+    return f"cart-{int(user_id) % CART_LOCK_STRIPES}"
+
+
+def cart_lock(user_id):
+    """Hold around a get_cart() ... save_cart() sequence so workers cannot interleave on one cart."""
+    return file_lock(cart_lock_name(user_id))
+
+
+# ------------------------------------------------------------
+# Bounded LRU cart cache
+# ------------------------------------------------------------
+class CartCache:
+    """
+    Keeps the most recently used carts in memory up to `budget_bytes`.
+    Writes go straight through to the buyer's own file, so evicting a cart only drops
+    it from memory; the next get_cart() faults it back in from disk.
+    Memory stays flat no matter how many buyers the shop has ever had.
+    In shared (multi-worker) mode a cached cart is only used while its file is unchanged.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()   # user_id -> (cart, size, file signature)
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._migrated = False
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _migrate_legacy(self):
+        """Splits the old single carts.json into per-user files, once."""
+        self._migrated = True
+        with file_lock("carts-migration"):
+            if not os.path.exists(LEGACY_CART_FILE):
+                return
+            os.makedirs(CART_DIR, exist_ok=True)
+            for user_id, cart in load_json(LEGACY_CART_FILE).items():
+                if cart and not os.path.exists(cart_path(user_id)):
+                    save_json(cart_path(user_id), cart)
+            os.replace(LEGACY_CART_FILE, LEGACY_CART_FILE + ".migrated")
+
+    @staticmethod
+    def _size(cart: dict) -> int:
+        return len(json.dumps(cart, separators=(",", ":"))) + ENTRY_OVERHEAD
+
+    def _store(self, key: str, cart: dict, signature=None):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.resident_bytes -= old[1]
+        size = self._size(cart)
+        self.entries[key] = (cart, size, signature)
+        self.resident_bytes += size
+        while self.resident_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.resident_bytes -= evicted_size
+            self.evictions += 1
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def get(self, user_id) -> dict:
+        key = str(user_id)
+        with self._lock:
+            if not self._migrated:
+                self._migrate_legacy()
+            shared = shared_mode()
+            signature = file_signature(cart_path(user_id)) if shared else None
+            entry = self.entries.get(key)
+            if entry is not None and (not shared or entry[2] == signature):
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return dict(entry[0])
+
+            self.misses += 1
+            cart = decode_cart(load_json(cart_path(user_id)))
+            self._store(key, cart, signature)
+            return dict(cart)
+
+    def put(self, user_id, cart: dict):
+        key = str(user_id)
+        with self._lock:
+            if not self._migrated:
+                self._migrate_legacy()
+            if cart:
+                save_json(cart_path(user_id), cart)
+            elif os.path.exists(cart_path(user_id)):
+                os.remove(cart_path(user_id))
+            self._store(key, dict(cart), file_signature(cart_path(user_id)) if shared_mode() else None)
+
+    def invalidate(self, user_id):
+        """Forgets the cached copy, e.g. after the file was changed by a transaction."""
+        with self._lock:
+            entry = self.entries.pop(str(user_id), None)
+            if entry is not None:
+                self.resident_bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+cart_cache = CartCache()
+
+
+# ------------------------------------------------------------
+# Cart storage ({product_id: quantity} per user)
+# ------------------------------------------------------------
+def get_cart(user_id) -> dict:
+    return cart_cache.get(user_id)
+
+
+def save_cart(user_id, cart: dict):
+    cart_cache.put(user_id, cart)
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List, Tuple
+
+from utils.models import Product, ValidationError
+
+# Columns written by export and understood by import
+CSV_COLUMNS = ["id", "name", "description", "price", "stock", "image", "payment_methods", "discount_percent"]
+
+# Separator for payment methods inside a single CSV cell
+METHOD_SEPARATOR = "|"
+
+
+# ------------------------------------------------------------
+# Import pipeline: bytes -> raw rows -> validated products
+# ------------------------------------------------------------
+def detect_format(filename: str) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".jsonl") or name.endswith(".ndjson"):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError("Unsupported file type — use .csv or .jsonl")
+
+
+def iter_rows(data: bytes, fmt: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Yields (line_number, raw_row) without materializing the whole file as records.
+    Raises ValueError if the file itself cannot be read (not UTF-8, broken CSV quoting).
+    """
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+    try:
+        yield from _parse(text, fmt)
+    except UnicodeDecodeError:
+        raise ValueError("File is not valid UTF-8 — save it as UTF-8 and retry") from None
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV: {e}") from None
+
+
+def _parse(text: io.TextIOWrapper, fmt: str) -> Iterator[Tuple[int, dict]]:
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, {"__error__": f"invalid JSON ({e.msg})"}
+
+
+def normalize_row(row: dict) -> dict:
+    """Turns a CSV/JSONL row into the shape Product.from_dict expects."""
+    if "__error__" in row:
+        raise ValidationError(row["__error__"])
+    if not isinstance(row, dict):
+        raise ValidationError("row must be an object")
+
+    out = {k: v for k, v in row.items() if k in CSV_COLUMNS or k == "price_cents"}
+    for key in ("stock", "image", "discount_percent", "price", "description"):
+        if out.get(key) == "":
+            out.pop(key)
+
+    methods = out.get("payment_methods")
+    if isinstance(methods, str):
+        out["payment_methods"] = [m.strip() for m in methods.split(METHOD_SEPARATOR) if m.strip()]
+    if not str(out.get("name") or "").strip():
+        raise ValidationError("missing name")
+    # Product defaults to a price of 0, which would silently import a free catalog
+    if out.get("price") is None and out.get("price_cents") is None:
+        raise ValidationError("missing price")
+    return out
+
+
+def validate_rows(rows: Iterable[Tuple[int, dict]], first_id: int,
+                  errors: List[str]) -> Iterator[Product]:
+    """
+    Validates rows and allocates ids sequentially from first_id. Invalid rows are
+    skipped and described in `errors`; ids are only consumed by valid rows.
+    """
+    next_id = first_id
+    for line_no, row in rows:
+        try:
+            fields = normalize_row(row)
+            fields["id"] = next_id
+            product = Product.from_dict(fields)
+        except (ValidationError, ValueError, TypeError) as e:
+            errors.append(f"line {line_no}: {e}")
+            continue
+        # posted message references never come from an import
+        product.message_id = None
+        product.channel_id = None
+        next_id += 1
+        yield product
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+def export_rows(products: Iterable[Product], fmt: str) -> io.BytesIO:
+    buf = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for p in products:
+            writer.writerow({
+                "id": p.id,
+                "name": p.name,
+                "description": p.description,
+                "price": f"{p.price:.2f}",
+                "stock": "" if p.stock is None else p.stock,
+                "image": p.image or "",
+                "payment_methods": METHOD_SEPARATOR.join(p.payment_methods),
+                "discount_percent": p.discount_percent,
+            })
+    else:
+        for p in products:
+            buf.write(json.dumps(p.to_dict(), separators=(",", ":")))
+            buf.write("\n")
+    return io.BytesIO(buf.getvalue().encode("utf-8"))
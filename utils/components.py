@@ -0,0 +1,84 @@
+import re
+
+import discord
+
+from utils.carts import get_cart, save_cart, cart_lock
+from utils.permissions import in_allowed_guild
+from utils.pricing import get_pricebook
+from utils.stock import stock_engine
+
+# Quantity steps offered on every product message
+QUANTITY_STEPS = (1, 5)
+
+
+# ------------------------------------------------------------
+# Add-to-cart button
+# ------------------------------------------------------------
+class CartButton(discord.ui.DynamicItem[discord.ui.Button], template=r"cart:(?P<action>add|sub):(?P<product_id>[0-9]+):(?P<qty>[0-9]+)"):
+    """
+    One persistent handler for every product message. The product id and quantity are encoded in
+    the custom_id, so nothing is stored per message and the handler is registered once at startup.
+    """
+
+    def __init__(self, action: str, product_id: int, qty: int):
+        if action == "add":
+            label = "🛒 Add to cart" if qty == 1 else f"+{qty}"
+            style = discord.ButtonStyle.success if qty == 1 else discord.ButtonStyle.secondary
+        else:
+            label = f"−{qty}"
+            style = discord.ButtonStyle.secondary
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=style,
+            custom_id=f"cart:{action}:{product_id}:{qty}",
+        ))
+        self.action = action
+        self.product_id = product_id
+        self.qty = qty
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match):
+        return cls(match["action"], int(match["product_id"]), int(match["qty"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        if not await in_allowed_guild(interaction):
+            return await interaction.response.send_message("❌ This bot is not enabled in this server.", ephemeral=True)
+
+        pid = str(self.product_id)
+        unit = get_pricebook().units.get(pid)
+        if unit is None:
+            return await interaction.response.send_message("❌ This product is no longer available.", ephemeral=True)
+        name = unit[0]
+
+        with cart_lock(interaction.user.id):
+            cart = get_cart(interaction.user.id)
+            current = cart.get(pid, 0)
+            wanted = current + self.qty if self.action == "add" else current - self.qty
+
+            available = stock_engine.available(pid) if self.action == "add" else None
+            if self.action == "sub" and current == 0:
+                reply = f"❌ **{name}** is not in your cart."
+            elif available is not None and wanted > available:
+                reply = f"❌ Only {max(0, available)} of **{name}** available right now."
+            elif wanted > 0:
+                cart[pid] = wanted
+                save_cart(interaction.user.id, cart)
+                reply = f"🛒 **{name}** × {wanted} in your cart."
+            else:
+                cart.pop(pid, None)
+                save_cart(interaction.user.id, cart)
+                reply = f"🗑 Removed **{name}** from your cart."
+
+        await interaction.response.send_message(reply, ephemeral=True)
+
+
+def product_view(product_id: int) -> discord.ui.View:
+    """
+    Buttons attached to a posted product embed. The view only holds dynamic items,
+    so the client does not keep a copy of it per message.
+    """
+    view = discord.ui.View(timeout=None)
+    for step in QUANTITY_STEPS:
+        view.add_item(CartButton("add", product_id, step))
+    view.add_item(CartButton("sub", product_id, 1))
+    return view
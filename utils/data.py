@@ -1,5 +1,9 @@
+import hashlib
 import json
 import os
+import tempfile
+
+from utils.locks import file_lock
 
 # Ensures the data folder exists
 DATA_DIR = "data"
@@ -31,12 +35,137 @@ def load_json(path: str):
 def save_json(path: str, data: dict):
     """
     Safely writes a dictionary to a JSON file.
-    Creates the folder if necessary.
+    Creates the folder if necessary. Output is compact (no indentation).
+    The file is written to a temporary name and swapped in, so readers never see half a file.
+    The temporary name is unique per call, so two processes saving the same file never share it.
     """
 
     folder = os.path.dirname(path)
     if folder and not os.path.exists(folder):
         os.makedirs(folder)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=folder or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# ------------------------------------------------------------
+# Multi-file transactions
+# ------------------------------------------------------------
+JOURNAL_FILE = os.path.join(DATA_DIR, "journal.log")
+
+
+def _fsync(path: str):
+    """Flushes a file, or a directory's entries (renames, deletes), to disk."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return      # directories cannot be opened on Windows; there the rename is what we get
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _apply_writes(writes: list):
+    """Applies a journal record and makes it durable, so the journal can be deleted afterwards."""
+    folders = set()
+    for path, data in writes:
+        if data is None:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            save_json(path, data)
+            _fsync(path)
+        folders.add(os.path.dirname(path) or ".")
+    for folder in folders:
+        _fsync(folder)
+
+
+class Transaction:
+    """
+    Stages changes to several JSON files and commits them together.
+
+        with Transaction() as tx:
+            tickets = tx.get(TICKETS_FILE)
+            del tickets[channel_id]
+            tx.put(TICKETS_FILE, tickets)
+            tx.delete(SOME_OTHER_FILE)
+
+    On commit the full set of writes is appended to the journal as one checksummed record and
+    fsync'd, then applied; the applied files and their folders are fsync'd before the journal is
+    deleted. If the process dies while applying, recover_journal() replays the
+    record on the next start; a record that was not completely written is discarded.
+    Nothing is written if the block raises.
+    """
+
+    def __init__(self):
+        self.writes = {}
+
+    def get(self, path: str):
+        """Reads a file as it will look after this transaction (staged value wins)."""
+        if path in self.writes:
+            staged = self.writes[path]
+            return {} if staged is None else staged
+        return load_json(path)
+
+    def put(self, path: str, data):
+        self.writes[path] = data
+
+    def delete(self, path: str):
+        self.writes[path] = None
+
+    def commit(self):
+        if not self.writes:
+            return
+        writes = [[path, data] for path, data in self.writes.items()]
+        payload = json.dumps(writes, separators=(",", ":"))
+        checksum = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+        # the journal is shared by every worker process, so commits are serialised across them
+        with file_lock("journal"):
+            with open(JOURNAL_FILE, "w", encoding="utf-8") as f:
+                f.write(f"{checksum} {payload}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync(DATA_DIR)
+            # the applied files and their folders are fsync'd before the journal goes away
+            _apply_writes(writes)
+            os.remove(JOURNAL_FILE)
+        self.writes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+
+def recover_journal():
+    """
+    Finishes a commit that was interrupted after its journal record was made durable.
+    Incomplete or corrupt records are dropped, which leaves the files as they were before.
+    """
+    with file_lock("journal"):
+        if not os.path.exists(JOURNAL_FILE):
+            return
+        with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+            line = f.read()
+        if line.endswith("\n") and " " in line:
+            checksum, payload = line[:-1].split(" ", 1)
+            if hashlib.sha256(payload.encode("utf-8")).hexdigest() == checksum:
+                _apply_writes(json.loads(payload))
+        os.remove(JOURNAL_FILE)
+
+
+recover_journal()
@@ -0,0 +1,139 @@
+import discord
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Discord embed limits
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_LIMIT = 25
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+# Room kept for the "Page x/y" footer EmbedPaginator adds
+FOOTER_RESERVE = 32
+# Discord rejects empty field names/values
+EMPTY = "\u200b"
+# A body field that only partly fits is clipped if at least this much of its value still fits
+MIN_CLIPPED_VALUE = 16
+
+Field = Tuple[str, str]
+
+
+def clip(text: str, limit: int) -> str:
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+
+def _compile(text: Optional[str]) -> Optional[Callable[[dict], str]]:
+    """Static strings are returned as-is; only strings with placeholders are formatted per call."""
+    if text is None:
+        return None
+    if "{" not in text:
+        return lambda values: text
+    return lambda values: text.format_map(values)
+
+
+def field_size(name: str, value: str) -> int:
+    return len(name) + len(value)
+
+
+def _prepare(fields: Iterable[Field]) -> List[Field]:
+    return [(clip(name, FIELD_NAME_LIMIT) or EMPTY, clip(value, FIELD_VALUE_LIMIT) or EMPTY) for name, value in fields]
+
+
+# ------------------------------------------------------------
+# Embed templates
+# ------------------------------------------------------------
+class EmbedTemplate:
+    """
+    The static part of an embed (title, description, colour, thumbnail, fixed fields), compiled once
+    per command. render() only fills in placeholders and the dynamic fields, clipping every part to
+    Discord's limits, and paginate() splits a long field list so each page stays under 6000
+    characters and 25 fields.
+
+        CART = EmbedTemplate("🛒 Cart of {user}", discord.Color.gold())
+        embed = CART.render(fields=[("Sword", "× 2")], user=member)
+    """
+
+    def __init__(self,
+                 title: str,
+                 color: discord.Color,
+                 description: Optional[str] = None,
+                 thumbnail: Optional[str] = None,
+                 fields: Sequence[Field] = ()):
+        self.title = _compile(title)
+        self.description = _compile(description)
+        self.fields = [(_compile(name), _compile(value)) for name, value in fields]
+        self.base = {"type": "rich", "color": color.value}
+        if thumbnail:
+            self.base["thumbnail"] = {"url": thumbnail}
+
+    def _head(self, values: dict) -> Tuple[str, Optional[str]]:
+        title = clip(self.title(values), TITLE_LIMIT)
+        description = clip(self.description(values), DESCRIPTION_LIMIT) if self.description else None
+        return title, description
+
+    def render(self, fields: Iterable[Field] = (), summary: Sequence[Field] = (), **values) -> discord.Embed:
+        """
+        Builds the embed: the template's fields, then `fields`, then `summary`. Room for the template
+        and summary fields is reserved first, so when the 25-field or 6000-character budget runs out
+        it is the body that gives way: the first field that does not fit is clipped (or dropped) and
+        the rest are left out. Use paginate() to spread a long body over pages instead.
+        """
+        title, description = self._head(values)
+        data = dict(self.base, title=title)
+        budget = EMBED_TOTAL_LIMIT - FOOTER_RESERVE - len(title)
+        if description:
+            data["description"] = description
+            budget -= len(description)
+
+        static = _prepare((name(values), value(values)) for name, value in self.fields)
+        fixed = []
+        for name, value in static + _prepare(summary):
+            size = field_size(name, value)
+            if len(fixed) == EMBED_FIELD_LIMIT or size > budget:
+                break
+            budget -= size
+            fixed.append((name, value))
+        head, tail = fixed[:len(static)], fixed[len(static):]
+
+        body = []
+        slots = EMBED_FIELD_LIMIT - len(fixed)
+        for name, value in _prepare(fields):
+            if len(body) == slots:
+                break
+            size = field_size(name, value)
+            if size > budget:
+                if budget - len(name) >= MIN_CLIPPED_VALUE:
+                    body.append((name, clip(value, budget - len(name))))
+                break
+            budget -= size
+            body.append((name, value))
+
+        data["fields"] = [{"name": name, "value": value, "inline": False} for name, value in head + body + tail]
+        return discord.Embed.from_dict(data)
+
+    def paginate(self, lines: Sequence[Field], summary: Sequence[Field] = (),
+                 max_lines: int = EMBED_FIELD_LIMIT, **values) -> List[Tuple[int, int]]:
+        """
+        Splits `lines` into (start, end) ranges so that each page, with the template's own fields and
+        `summary` repeated on it, fits Discord's limits. Sizes are summed as the lines are walked;
+        nothing is rendered.
+        """
+        title, description = self._head(values)
+        fixed = [(name(values), value(values)) for name, value in self.fields] + list(summary)
+        budget = EMBED_TOTAL_LIMIT - FOOTER_RESERVE - len(title) - len(description or "")
+        budget -= sum(field_size(clip(n, FIELD_NAME_LIMIT), clip(v, FIELD_VALUE_LIMIT)) for n, v in fixed)
+        slots = max(1, min(max_lines, EMBED_FIELD_LIMIT - len(fixed)))
+
+        pages = []
+        start, used = 0, 0
+        for i, (name, value) in enumerate(lines):
+            size = field_size(clip(name, FIELD_NAME_LIMIT), clip(value, FIELD_VALUE_LIMIT))
+            if i > start and (i - start == slots or used + size > budget):
+                pages.append((start, i))
+                start, used = i, 0
+            used += size
+        pages.append((start, len(lines)))
+        return pages
@@ -0,0 +1,171 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from utils.models import Product
+
+# Events a subscriber may have waiting before publishers have to wait for it
+DEFAULT_QUEUE_SIZE = 256
+
+
+# ------------------------------------------------------------
+# Event types
+# ------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class ProductChanged:
+    """
+    A product was added, edited (price, stock, discount, methods, ...) or removed.
+    `product` is the saved state when the publisher has it, so subscribers need not reread the catalog.
+    """
+    product_id: int
+    product: Optional[Product] = None
+    removed: bool = False
+
+    @property
+    def key(self):
+        return ("product", self.product_id)
+
+
+@dataclass(frozen=True, slots=True)
+class TicketChanged:
+    channel_id: int
+    status: Optional[str] = None     # None when the ticket was removed
+
+    @property
+    def key(self):
+        return ("ticket", self.channel_id)
+
+
+Handler = Callable[[object], Awaitable[None]]
+
+
+# ------------------------------------------------------------
+# Subscriber queue
+# ------------------------------------------------------------
+class Subscription:
+    """
+    One consumer of the bus. Pending events are kept per key, so ten edits to the same product
+    while the consumer is busy become one event carrying the latest state. When `maxsize`
+    distinct keys are waiting, publish() waits for this consumer to catch up (backpressure).
+    """
+
+    def __init__(self, name: str, types: Tuple[Type, ...], handler: Handler, maxsize: int):
+        self.name = name
+        self.types = types
+        self.handler = handler
+        self.maxsize = maxsize
+        self.pending: "OrderedDict[tuple, object]" = OrderedDict()
+        self.delivered = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # let any publisher waiting on this subscriber go
+        self.pending.clear()
+        self._space.set()
+
+    async def offer(self, event):
+        key = event.key
+        if key in self.pending:
+            self.pending[key] = event
+            self.coalesced += 1
+            return
+        while len(self.pending) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+            if key in self.pending:
+                self.pending[key] = event
+                self.coalesced += 1
+                return
+        self.pending[key] = event
+        self._ready.set()
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            _, event = self.pending.popitem(last=False)
+            if not self.pending:
+                self._ready.clear()
+            self._space.set()
+            try:
+                await self.handler(event)
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"Event handler {self.name} failed on {event}: {e}")
+
+
+# ------------------------------------------------------------
+# Event bus
+# ------------------------------------------------------------
+class EventBus:
+    """
+    In-process publish/subscribe. Stores and commands publish typed change events; each
+    subscriber consumes them in its own task, so a slow Discord edit never delays the command
+    that caused it. Only this process's subscribers see an event (one bus per worker).
+    """
+
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+        self.published: Dict[str, int] = {}
+        self._emitting = set()
+
+    def subscribe(self, name: str, types, handler: Handler, maxsize: int = DEFAULT_QUEUE_SIZE) -> Subscription:
+        """Must be called from inside the running loop (e.g. a cog's cog_load)."""
+        types = types if isinstance(types, tuple) else (types,)
+        sub = Subscription(name, types, handler, maxsize)
+        self.subscriptions.append(sub)
+        sub.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        sub.stop()
+        if sub in self.subscriptions:
+            self.subscriptions.remove(sub)
+
+    async def publish(self, event):
+        kind = type(event).__name__
+        self.published[kind] = self.published.get(kind, 0) + 1
+        for sub in list(self.subscriptions):
+            if isinstance(event, sub.types):
+                await sub.offer(event)
+
+    def emit(self, event):
+        """publish() for synchronous code. Ignored when no event loop is running (scripts, tools)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.publish(event))
+        self._emitting.add(task)
+        task.add_done_callback(self._emitting.discard)
+
+    def stats(self) -> dict:
+        return {
+            "published": dict(self.published),
+            "subscribers": [{
+                "name": sub.name,
+                "pending": len(sub.pending),
+                "delivered": sub.delivered,
+                "coalesced": sub.coalesced,
+                "failed": sub.failed,
+            } for sub in self.subscriptions],
+        }
+
+
+# Shared bus used by the cogs
+event_bus = EventBus()
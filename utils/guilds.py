@@ -0,0 +1,115 @@
+import asyncio
+import os
+import signal
+from typing import Awaitable, Callable, FrozenSet, Optional, Tuple
+
+from utils.data import load_json
+from utils.models import Config
+
+CONFIG_FILE = "data/config.json"
+
+# Used when data/config.json does not define allowed_guilds
+DEFAULT_ALLOWED_GUILDS = (
+    1431698219892478074,
+    1441231445283704943,
+)
+
+# Seconds between checks of the config file for changes
+WATCH_INTERVAL = 5
+
+
+# ------------------------------------------------------------
+# Guild allow-list
+# ------------------------------------------------------------
+class GuildAllowList:
+    """
+    The single source of truth for which guilds the bot serves.
+
+    Membership checks are a frozenset lookup with no I/O. The set is reloaded from
+    data/config.json when the file changes (polled) or on SIGHUP, and a callback
+    receives the guilds that were added and removed so the bot can sync / leave them.
+    """
+
+    def __init__(self, config_file: str = CONFIG_FILE, defaults=DEFAULT_ALLOWED_GUILDS):
+        self.config_file = config_file
+        self.defaults = frozenset(defaults)
+        self.guilds: FrozenSet[int] = frozenset()
+        self.loaded = False
+        self._mtime = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_change: Optional[Callable[[FrozenSet[int], FrozenSet[int]], Awaitable[None]]] = None
+
+    def __contains__(self, guild_id) -> bool:
+        if not self.loaded:
+            self.reload()
+        return guild_id in self.guilds
+
+    def __iter__(self):
+        if not self.loaded:
+            self.reload()
+        return iter(self.guilds)
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """Re-reads the config and returns (added, removed)."""
+        self._mtime = self._file_mtime()
+        try:
+            configured = Config.from_dict(load_json(self.config_file)).allowed_guilds
+        except ValueError as e:
+            # keep serving the current list if someone saved a broken config; with no list yet
+            # (broken at startup) serve the defaults rather than re-reading on every check
+            print(f"Ignoring invalid allowed_guilds in {self.config_file}: {e}")
+            if not self.loaded:
+                self.guilds = self.defaults
+                self.loaded = True
+            return frozenset(), frozenset()
+
+        new = frozenset(configured) if configured else self.defaults
+        old = self.guilds if self.loaded else new
+        self.guilds = new
+        self.loaded = True
+        return new - old, old - new
+
+    # ----------------------------
+    # Hot reload
+    # ----------------------------
+    def start_watching(self, on_change: Callable[[FrozenSet[int], FrozenSet[int]], Awaitable[None]]):
+        self._on_change = on_change
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.trigger_reload)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            # no SIGHUP on Windows; file polling still works
+            pass
+
+    def stop_watching(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def trigger_reload(self):
+        asyncio.get_running_loop().create_task(self._reload_and_notify())
+
+    async def _reload_and_notify(self):
+        added, removed = self.reload()
+        if (added or removed) and self._on_change:
+            try:
+                await self._on_change(added, removed)
+            except Exception as e:
+                print(f"Allow-list update failed: {e}")
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            if self._file_mtime() != self._mtime:
+                await self._reload_and_notify()
+
+
+# Shared allow-list used by bot.py and the permission checks
+allowed_guilds = GuildAllowList()
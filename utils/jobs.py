@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import discord
+
+JOBS_FILE = "data/jobs.sqlite3"
+
+# Retry policy for failed jobs
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5          # seconds, doubled per attempt
+BACKOFF_MAX = 30 * 60
+# Longest the runner sleeps when nothing is due
+POLL_INTERVAL = 30
+# A job being run is pushed this far ahead so no other runner picks it up; if the runner dies
+# mid-job, the job becomes due again once the lease runs out
+LEASE_SECONDS = 5 * 60
+
+# kind -> (calls, per seconds) allowed per bucket. Channel name edits are limited by Discord
+# to 2 per 10 minutes per channel; the others only need to stay clear of bursts.
+RATE_LIMITS = {
+    "channel_rename": (2, 600),
+    "channel_delete": (5, 5),
+    "message_delete": (5, 5),
+}
+
+Handler = Callable[[discord.Client, dict], Awaitable[Optional[bool]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT UNIQUE,
+    bucket TEXT,
+    payload TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_run_at ON jobs (run_at);
+CREATE TABLE IF NOT EXISTS bucket_hits (
+    bucket TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bucket_hits_bucket ON bucket_hits (bucket, ts);
+"""
+
+
+# ------------------------------------------------------------
+# Durable job queue
+# ------------------------------------------------------------
+class JobQueue:
+    """
+    Discord side effects (renames, deletes) that should not hold up the interaction.
+
+    Jobs live in a SQLite file, so anything not yet done when the bot stops runs after the
+    restart. A job enqueued with the key of one still pending replaces it (three renames of
+    one channel become one rename to the latest name; closing the ticket replaces the rename
+    with the delete). Each kind has a rate-limit bucket that is checked before the call, so a
+    job waits for its slot instead of hitting Discord's limit. Failures are retried with
+    exponential backoff; missing channels/messages or missing permissions drop the job.
+    """
+
+    def __init__(self, path: str = JOBS_FILE):
+        self.path = path
+        self.handlers: Dict[str, Handler] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def handler(self, kind: str):
+        """Registers the coroutine that performs jobs of `kind`. Returning False means no API call was made."""
+        def decorator(fn: Handler) -> Handler:
+            self.handlers[kind] = fn
+            return fn
+        return decorator
+
+    # ----------------------------
+    # Enqueueing
+    # ----------------------------
+    def enqueue(self, kind: str, payload: dict, key: Optional[str] = None, bucket: Optional[str] = None, delay: float = 0):
+        self.db.execute(
+            """
+            INSERT INTO jobs (kind, key, bucket, payload, run_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                kind = excluded.kind, bucket = excluded.bucket, payload = excluded.payload,
+                run_at = excluded.run_at, attempts = 0, last_error = NULL
+            """,
+            (kind, key, bucket or kind, json.dumps(payload), time.time() + delay)
+        )
+        if self._wake is not None:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    # ----------------------------
+    # Running
+    # ----------------------------
+    def start(self, bot: discord.Client):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, bot: discord.Client):
+        await bot.wait_until_ready()
+        while True:
+            try:
+                delay = await self.run_due(bot)
+            except Exception as e:
+                print(f"Job runner error: {e}")
+                delay = POLL_INTERVAL
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _bucket_wait(self, kind: str, bucket: str, now: float) -> float:
+        """Seconds until `bucket` has a free slot (0 = go)."""
+        limit = RATE_LIMITS.get(kind)
+        if not limit:
+            return 0
+        calls, window = limit
+        rows = self.db.execute(
+            "SELECT ts FROM bucket_hits WHERE bucket = ? AND ts > ? ORDER BY ts DESC LIMIT ?",
+            (bucket, now - window, calls)
+        ).fetchall()
+        if len(rows) < calls:
+            return 0
+        return rows[-1][0] + window - now
+
+    async def run_due(self, bot: discord.Client) -> float:
+        """Runs every job that is due and has a free bucket slot. Returns seconds until the next one."""
+        now = time.time()
+        longest = max(window for _, window in RATE_LIMITS.values())
+        self.db.execute("DELETE FROM bucket_hits WHERE ts < ?", (now - longest,))
+
+        due = self.db.execute(
+            "SELECT id, kind, bucket, payload, attempts FROM jobs WHERE run_at <= ? ORDER BY run_at LIMIT 50",
+            (now,)
+        ).fetchall()
+        for job_id, kind, bucket, payload, attempts in due:
+            wait = self._bucket_wait(kind, bucket, time.time())
+            if wait > 0:
+                self.db.execute("UPDATE jobs SET run_at = ? WHERE id = ?", (time.time() + wait, job_id))
+                continue
+
+            # claim the job before awaiting anything: another runner (or a second pass of this one)
+            # that selected the same row finds run_at moved and skips it
+            claimed = self.db.execute(
+                "UPDATE jobs SET run_at = ? WHERE id = ? AND run_at <= ?",
+                (time.time() + LEASE_SECONDS, job_id, now)
+            ).rowcount
+            if not claimed:
+                continue
+
+            handler = self.handlers.get(kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"no handler for job kind {kind}")
+                called = await handler(bot, json.loads(payload))
+            except (discord.NotFound, discord.Forbidden, LookupError) as e:
+                print(f"Dropping job {kind} {payload}: {e}")
+                self._finish(job_id, payload)
+                continue
+            except Exception as e:
+                self._retry(job_id, kind, payload, attempts, e)
+                continue
+
+            if called is not False:
+                self.db.execute("INSERT INTO bucket_hits (bucket, ts) VALUES (?, ?)", (bucket, time.time()))
+            self._finish(job_id, payload)
+
+        row = self.db.execute("SELECT MIN(run_at) FROM jobs").fetchone()
+        if row[0] is None:
+            return POLL_INTERVAL
+        return min(POLL_INTERVAL, max(0.1, row[0] - time.time()))
+
+    def _finish(self, job_id: int, payload: str):
+        # if the job was replaced while it ran, keep the newer payload
+        self.db.execute("DELETE FROM jobs WHERE id = ? AND payload = ?", (job_id, payload))
+
+    def _retry(self, job_id: int, kind: str, payload: str, attempts: int, error: Exception):
+        attempts += 1
+        if attempts >= MAX_ATTEMPTS:
+            print(f"Giving up on job {kind} {payload} after {attempts} attempts: {error}")
+            self._finish(job_id, payload)
+            return
+        retry_after = getattr(error, "retry_after", None)
+        delay = retry_after or min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempts) * random.uniform(0.8, 1.2)
+        self.db.execute(
+            "UPDATE jobs SET attempts = ?, run_at = ?, last_error = ? WHERE id = ? AND payload = ?",
+            (attempts, time.time() + delay, str(error)[:500], job_id, payload)
+        )
+
+
+# Shared queue; bot.py starts the runner
+job_queue = JobQueue()
+
+
+# ------------------------------------------------------------
+# Job kinds
+# ------------------------------------------------------------
+async def _channel(bot: discord.Client, channel_id: int):
+    return bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+
+@job_queue.handler("channel_rename")
+async def _rename_channel(bot, payload):
+    channel = await _channel(bot, payload["channel_id"])
+    if channel.name == payload["name"]:
+        return False
+    await channel.edit(name=payload["name"])
+
+
+@job_queue.handler("channel_delete")
+async def _delete_channel(bot, payload):
+    channel = await _channel(bot, payload["channel_id"])
+    await channel.delete(reason=payload.get("reason"))
+
+
+@job_queue.handler("message_delete")
+async def _delete_message(bot, payload):
+    channel = await _channel(bot, payload["channel_id"])
+    await channel.get_partial_message(payload["message_id"]).delete()
+
+
+def rename_channel_later(channel_id: int, name: str):
+    job_queue.enqueue("channel_rename", {"channel_id": channel_id, "name": name},
+                      key=f"channel:{channel_id}", bucket=f"rename:{channel_id}")
+
+
+def delete_channel_later(channel_id: int, reason: Optional[str] = None):
+    # same key as renames: a pending rename of a channel about to be deleted is dropped
+    job_queue.enqueue("channel_delete", {"channel_id": channel_id, "reason": reason},
+                      key=f"channel:{channel_id}", bucket="channel_delete")
+
+
+def delete_message_later(channel_id: int, message_id: int):
+    job_queue.enqueue("message_delete", {"channel_id": channel_id, "message_id": message_id},
+                      key=f"message:{message_id}", bucket=f"messages:{channel_id}")
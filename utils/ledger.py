@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from utils.data import load_json, save_json
+from utils.locks import file_lock, shared_mode
+
+LEDGER_DIR = "data/ledger"
+AGGREGATES_FILE = os.path.join(LEDGER_DIR, "aggregates.json")
+# A new segment is started once the current one reaches this size
+SEGMENT_BYTES = 1024 * 1024
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _empty_aggregates() -> dict:
+    return {
+        "segment": 1,          # segment the next record goes to
+        "offset": 0,           # bytes of that segment already folded into the aggregates
+        "seq": 0,
+        "revenue": 0,
+        "orders": {"checkout": 0, "paid": 0, "delivered": 0, "closed": 0},
+        "by_product": {},      # product_id -> {"name", "units", "cents"}
+        "by_day": {},          # YYYY-MM-DD -> {"orders", "cents"}
+        "by_method": {},       # payment method -> cents
+        "open": {},            # channel_id -> latest unpaid checkout (needed when it gets paid)
+    }
+
+
+# ------------------------------------------------------------
+# Append-only order ledger
+# ------------------------------------------------------------
+class Ledger:
+    """
+    Order events are appended as JSON lines to numbered segment files and never rewritten.
+    Sales aggregates are updated as each event is appended and saved next to the segments
+    together with the position they cover, so reports never rescan the ledger. If the process
+    died between appending and saving aggregates, the missing tail is folded in on load.
+    With several worker processes the same catch-up runs under the "ledger" file lock before
+    every append and read, which folds in whatever the other workers appended.
+    """
+
+    def __init__(self, folder: str = LEDGER_DIR):
+        self.folder = folder
+        self.aggregates_file = os.path.join(folder, "aggregates.json")
+        self._lock = threading.Lock()
+        self.agg: Optional[dict] = None
+
+    def segment_path(self, number: int) -> str:
+        return os.path.join(self.folder, f"segment-{number:06d}.jsonl")
+
+    # ----------------------------
+    # Loading / catch-up
+    # ----------------------------
+    def _load(self):
+        if self.agg is not None:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        agg = load_json(self.aggregates_file) or _empty_aggregates()
+
+        # fold in anything appended after the aggregates were last saved
+        caught_up = self._catch_up(agg)
+        self.agg = agg
+        if caught_up:
+            save_json(self.aggregates_file, agg)
+
+    def _catch_up(self, agg: dict) -> bool:
+        """
+        Applies every complete record past agg's segment/offset. Returns True if any were found.
+        A torn write at the end of a segment (crash mid-append) is cut off, so the next append
+        starts on a clean line; a complete but unreadable record is logged and skipped.
+        Callers hold the "ledger" lock, so no other append can be in progress.
+        """
+        caught_up = False
+        while True:
+            path = self.segment_path(agg["segment"])
+            if not os.path.exists(path):
+                break
+            with open(path, "r+b") as f:
+                f.seek(agg["offset"])
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        print(f"Truncating torn ledger record in {path} at byte {agg['offset']}")
+                        f.truncate(agg["offset"])
+                        f.flush()
+                        os.fsync(f.fileno())
+                        caught_up = True
+                        break
+                    try:
+                        self._apply(agg, json.loads(raw))
+                    except (ValueError, KeyError, TypeError) as e:
+                        print(f"Skipping unreadable ledger record in {path} at byte {agg['offset']}: {e}")
+                    agg["offset"] += len(raw)
+                    caught_up = True
+            if os.path.exists(self.segment_path(agg["segment"] + 1)):
+                agg["segment"] += 1
+                agg["offset"] = 0
+            else:
+                break
+        return caught_up
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, file_lock("ledger"):
+            self._load()
+            if shared_mode():
+                self._catch_up(self.agg)
+            yield self.agg
+
+    # ----------------------------
+    # Aggregation
+    # ----------------------------
+    @staticmethod
+    def _apply(agg: dict, record: dict):
+        kind = record["kind"]
+        agg["seq"] = max(agg["seq"], record.get("seq", 0))
+        agg["orders"][kind] = agg["orders"].get(kind, 0) + 1
+        channel = str(record.get("channel_id"))
+
+        if kind == "checkout":
+            # a new checkout in the same ticket supersedes the previous quote
+            agg["open"][channel] = {
+                "order_id": record["order_id"],
+                "lines": [[l["product_id"], l["name"], l["quantity"], l["line_cents"]] for l in record["lines"]],
+                "total": record["total"],
+                "methods": record.get("payment_methods", []),
+            }
+        elif kind == "paid":
+            order = agg["open"].pop(channel, None)
+            if order is None:
+                return
+            for pid, name, qty, cents in order["lines"]:
+                entry = agg["by_product"].setdefault(pid, {"name": name, "units": 0, "cents": 0})
+                entry["name"] = name
+                entry["units"] += qty
+                entry["cents"] += cents
+            day = agg["by_day"].setdefault(_day(record["ts"]), {"orders": 0, "cents": 0})
+            day["orders"] += 1
+            day["cents"] += order["total"]
+            agg["revenue"] = agg.get("revenue", 0) + order["total"]
+            method = record.get("method") or "unspecified"
+            agg["by_method"][method] = agg["by_method"].get(method, 0) + order["total"]
+        elif kind == "closed":
+            agg["open"].pop(channel, None)
+
+    # ----------------------------
+    # Appending
+    # ----------------------------
+    def append(self, kind: str, **fields) -> dict:
+        with self._locked() as agg:
+            record = {"seq": agg["seq"] + 1, "kind": kind, "ts": time.time(), **fields}
+            line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+            if agg["offset"] and agg["offset"] + len(line) > SEGMENT_BYTES:
+                agg["segment"] += 1
+                agg["offset"] = 0
+
+            with open(self.segment_path(agg["segment"]), "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._apply(agg, record)
+            agg["offset"] += len(line)
+            save_json(self.aggregates_file, agg)
+            return record
+
+    def record_checkout(self, channel_id, ticket_number, buyer_id, quote) -> dict:
+        """Snapshots a priced cart (utils.pricing.Quote) as an order."""
+        return self.append(
+            "checkout",
+            order_id=f"{channel_id}-{int(time.time() * 1000)}",
+            channel_id=channel_id,
+            ticket=ticket_number,
+            buyer_id=buyer_id,
+            lines=[{
+                "product_id": line.product_id,
+                "name": line.name,
+                "quantity": line.quantity,
+                "unit_cents": line.unit_cents,
+                "line_cents": line.line_cents,
+            } for line in quote.lines],
+            subtotal=quote.subtotal,
+            discount=quote.discount,
+            total=quote.total,
+            code=quote.code,
+            payment_methods=list(quote.payment_methods),
+        )
+
+    def record_status(self, kind: str, channel_id, **fields) -> dict:
+        return self.append(kind, channel_id=channel_id, **fields)
+
+    def open_order(self, channel_id) -> Optional[dict]:
+        with self._locked() as agg:
+            order = agg["open"].get(str(channel_id))
+            return dict(order) if order else None
+
+    def open_orders(self) -> dict:
+        """channel_id -> latest unpaid checkout, for every ticket that has one."""
+        with self._locked() as agg:
+            return {channel: dict(order) for channel, order in agg["open"].items()}
+
+    # ----------------------------
+    # Reports
+    # ----------------------------
+    def report(self, days: int) -> dict:
+        """
+        Sales figures for the last `days` days plus all-time per product and per method.
+        Cost is O(days) + O(products) — the ledger itself is not read.
+        """
+        with self._locked() as agg:
+            today = time.time()
+            per_day: List[tuple] = []
+            for i in range(days - 1, -1, -1):
+                day = _day(today - i * 86400)
+                stats = agg["by_day"].get(day, {"orders": 0, "cents": 0})
+                per_day.append((day, stats["orders"], stats["cents"]))
+            return {
+                "per_day": per_day,
+                "by_product": sorted(agg["by_product"].items(), key=lambda kv: -kv[1]["cents"]),
+                "by_method": sorted(agg["by_method"].items(), key=lambda kv: -kv[1]),
+                "orders": dict(agg["orders"]),
+                "revenue": agg.get("revenue", 0),
+            }
+
+
+# Shared ledger used by the cart, ticket and sales cogs
+ledger = Ledger()
@@ -0,0 +1,111 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows: only one worker is supported there
+    fcntl = None
+
+# Set by bot.py for every worker process
+WORKERS_ENV = "SHOP_WORKERS"
+WORKER_ID_ENV = "SHOP_WORKER_ID"
+LOCK_DIR = "data/locks"
+
+
+# ------------------------------------------------------------
+# Worker mode
+# ------------------------------------------------------------
+def worker_count() -> int:
+    try:
+        return max(1, int(os.getenv(WORKERS_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def shared_mode() -> bool:
+    """True when several worker processes share the data folder."""
+    return worker_count() > 1 and fcntl is not None
+
+
+def is_primary_worker() -> bool:
+    """Singleton jobs (command sync, backups, listing reconcile) only run in worker 0."""
+    return os.getenv(WORKER_ID_ENV, "0") == "0"
+
+
+def file_signature(path: str):
+    """Cheap change detector for files replaced via save_json (new inode on every write)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+# ------------------------------------------------------------
+# Cross-process locks
+# ------------------------------------------------------------
+class _Lock:
+    __slots__ = ("thread_lock", "depth", "fd", "pid")
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+        self.pid = None
+
+    def open(self, name: str) -> int:
+        # flock belongs to the open file, which a forked child would share with its parent
+        if self.fd is None or self.pid != os.getpid():
+            os.makedirs(LOCK_DIR, exist_ok=True)
+            self.fd = os.open(os.path.join(LOCK_DIR, f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            self.pid = os.getpid()
+        return self.fd
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _get(name: str) -> _Lock:
+    with _locks_guard:
+        lock = _locks.get(name)
+        if lock is None:
+            lock = _locks[name] = _Lock()
+        return lock
+
+
+@contextmanager
+def _hold(name: str):
+    lock = _get(name)
+    with lock.thread_lock:
+        locked = lock.depth == 0 and shared_mode()
+        if locked:
+            fcntl.flock(lock.open(name), fcntl.LOCK_EX)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if locked:
+                fcntl.flock(lock.fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(*names: str):
+    """
+    Exclusive lock on one or more named resources (e.g. "tickets", "cart-17").
+    Every name keeps an open lock file for the life of the process, so use a bounded set of names.
+
+    Always serialises threads of this process; in shared mode it is also an flock on
+    data/locks/<name>.lock so other workers wait too. Re-entrant, and names are taken in
+    sorted order so two callers locking the same set can never deadlock.
+    Never await while holding it.
+    """
+    ordered = sorted(set(names))
+    if not ordered:
+        yield
+        return
+    with _hold(ordered[0]):
+        with file_lock(*ordered[1:]):
+            yield
@@ -0,0 +1,280 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+class ValidationError(ValueError):
+    """Raised when a stored record does not match its schema."""
+
+
+# ------------------------------------------------------------
+# Field validators
+# ------------------------------------------------------------
+def _int(data: dict, key: str, default=None, *, minimum=None, maximum=None, required=False) -> Optional[int]:
+    value = data.get(key, default)
+    if value is None:
+        if required:
+            raise ValidationError(f"missing field '{key}'")
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValidationError(f"'{key}' must be an integer, got {type(value).__name__}")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError(f"'{key}' must be an integer, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise ValidationError(f"'{key}' must be >= {minimum}")
+    if maximum is not None and value > maximum:
+        raise ValidationError(f"'{key}' must be <= {maximum}")
+    return value
+
+
+def _str(data: dict, key: str, default: Optional[str] = "") -> Optional[str]:
+    value = data.get(key, default)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValidationError(f"'{key}' must be a string")
+    return value
+
+
+def _int_list(data: dict, key: str) -> List[int]:
+    value = data.get(key) or []
+    if not isinstance(value, list):
+        raise ValidationError(f"'{key}' must be a list")
+    return [int(v) for v in value]
+
+
+def to_cents(value) -> int:
+    """Converts a decimal price (float/str) to integer cents."""
+    try:
+        return int(round(float(value or 0) * 100))
+    except (TypeError, ValueError):
+        raise ValidationError(f"invalid price {value!r}")
+
+
+# ------------------------------------------------------------
+# Product
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class Product:
+    id: int
+    name: str
+    description: str = ""
+    price_cents: int = 0
+    stock: Optional[int] = None          # None = unlimited
+    image: Optional[str] = None
+    message_id: Optional[int] = None
+    channel_id: Optional[int] = None
+    payment_methods: List[str] = field(default_factory=list)
+    discount_percent: int = 0
+
+    @property
+    def price(self) -> float:
+        return self.price_cents / 100
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Product":
+        if not isinstance(data, dict):
+            raise ValidationError("product must be an object")
+        if "price_cents" in data:
+            price_cents = _int(data, "price_cents", 0, minimum=0)
+        else:
+            # legacy records stored a float price
+            price_cents = to_cents(data.get("price", 0))
+            if price_cents < 0:
+                raise ValidationError("'price' must be >= 0")
+
+        methods = data.get("payment_methods") or []
+        if not isinstance(methods, list) or not all(isinstance(m, str) for m in methods):
+            raise ValidationError("'payment_methods' must be a list of strings")
+
+        return cls(
+            id=_int(data, "id", required=True, minimum=1),
+            name=_str(data, "name", "Item") or "Item",
+            description=_str(data, "description", ""),
+            price_cents=price_cents,
+            stock=_int(data, "stock"),
+            image=_str(data, "image", None),
+            message_id=_int(data, "message_id"),
+            channel_id=_int(data, "channel_id"),
+            payment_methods=list(methods),
+            discount_percent=_int(data, "discount_percent", 0, minimum=0, maximum=100),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "price_cents": self.price_cents,
+            "stock": self.stock,
+            "image": self.image,
+            "message_id": self.message_id,
+            "channel_id": self.channel_id,
+            "payment_methods": self.payment_methods,
+            "discount_percent": self.discount_percent,
+        }
+
+
+# ------------------------------------------------------------
+# Ticket
+# ------------------------------------------------------------
+TICKET_STATUSES = ("open", "paid", "delivered")
+
+
+@dataclass(slots=True)
+class Ticket:
+    buyer_id: int
+    number: int
+    status: str = "open"
+    delivered: bool = False
+    discount_cents: int = 0
+    discount_code: Optional[str] = None
+
+    @property
+    def discount(self) -> float:
+        return self.discount_cents / 100
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Ticket":
+        if not isinstance(data, dict):
+            raise ValidationError("ticket must be an object")
+        status = _str(data, "status", "open")
+        if status not in TICKET_STATUSES:
+            raise ValidationError(f"unknown ticket status {status!r}")
+        if "discount_cents" in data:
+            discount_cents = _int(data, "discount_cents", 0, minimum=0)
+        else:
+            discount_cents = to_cents(data.get("discount", 0))
+        return cls(
+            buyer_id=_int(data, "buyer_id", required=True),
+            number=_int(data, "number", required=True, minimum=0),
+            status=status,
+            delivered=bool(data.get("delivered", False)),
+            discount_cents=discount_cents,
+            discount_code=_str(data, "discount_code", None),
+        )
+
+    def to_dict(self) -> dict:
+        data = {
+            "buyer_id": self.buyer_id,
+            "number": self.number,
+            "status": self.status,
+            "delivered": self.delivered,
+            "discount_cents": self.discount_cents,
+        }
+        if self.discount_code:
+            data["discount_code"] = self.discount_code
+        return data
+
+
+# ------------------------------------------------------------
+# Cart line (a priced cart entry)
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class CartLine:
+    product_id: str
+    name: str
+    quantity: int
+    unit_cents: int
+    percent_off: int = 0
+
+    @property
+    def line_cents(self) -> int:
+        return self.unit_cents * self.quantity
+
+
+def decode_cart(data) -> Dict[str, int]:
+    """Validates a stored cart ({product_id: quantity}) and drops non-positive quantities."""
+    if not isinstance(data, dict):
+        raise ValidationError("cart must be an object")
+    cart = {}
+    for pid, qty in data.items():
+        qty = _int({"quantity": qty}, "quantity", 0)
+        if qty > 0:
+            cart[str(pid)] = qty
+    return cart
+
+
+# ------------------------------------------------------------
+# Config
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class Config:
+    staff_roles: List[int] = field(default_factory=list)
+    ticket_category: Optional[int] = None
+    discount_codes: Dict[str, dict] = field(default_factory=dict)
+    image_storage_channel: Optional[int] = None
+    allowed_guilds: List[int] = field(default_factory=list)
+    owner_id: Optional[int] = None
+    reservation_minutes: Optional[int] = None
+    reconcile_repost: Optional[bool] = None   # repost product messages that were deleted
+    cart_cache_bytes: Optional[int] = None    # memory budget of the cart cache
+    payment_provider: Optional[str] = None    # "stub" or "http" turns on payment polling (utils/payments.py)
+    payment_api_url: Optional[str] = None
+    extra: Dict[str, object] = field(default_factory=dict)   # keys this model does not know about
+
+    KNOWN = ("staff_roles", "ticket_category", "discount_codes", "image_storage_channel",
+             "allowed_guilds", "owner_id", "reservation_minutes", "reconcile_repost",
+             "cart_cache_bytes", "payment_provider", "payment_api_url")
+    PAYMENT_PROVIDERS = ("stub", "http")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Config":
+        if not isinstance(data, dict):
+            raise ValidationError("config must be an object")
+        codes = data.get("discount_codes") or {}
+        if not isinstance(codes, dict):
+            raise ValidationError("'discount_codes' must be an object")
+        provider = _str(data, "payment_provider", None)
+        if provider is not None and provider not in cls.PAYMENT_PROVIDERS:
+            raise ValidationError(f"unknown payment_provider {provider!r}")
+        return cls(
+            staff_roles=_int_list(data, "staff_roles"),
+            ticket_category=_int(data, "ticket_category"),
+            discount_codes=dict(codes),
+            image_storage_channel=_int(data, "image_storage_channel"),
+            allowed_guilds=_int_list(data, "allowed_guilds"),
+            owner_id=_int(data, "owner_id"),
+            reservation_minutes=_int(data, "reservation_minutes", minimum=1),
+            reconcile_repost=None if data.get("reconcile_repost") is None else bool(data["reconcile_repost"]),
+            cart_cache_bytes=_int(data, "cart_cache_bytes", minimum=1024),
+            payment_provider=provider,
+            payment_api_url=_str(data, "payment_api_url", None),
+            extra={k: v for k, v in data.items() if k not in cls.KNOWN},
+        )
+
+    def to_dict(self) -> dict:
+        data = dict(self.extra)
+        for key in self.KNOWN:
+            value = getattr(self, key)
+            if value is None or value == [] or value == {}:
+                # keep keys the file already had, skip empty optional ones
+                if key not in ("staff_roles", "ticket_category", "discount_codes"):
+                    continue
+            data[key] = value
+        return data
+
+
+# ------------------------------------------------------------
+# Collection helpers
+# ------------------------------------------------------------
+def decode_products(data) -> List[Product]:
+    """Validates products.json. Accepts the legacy dict-of-products shape as well as the list."""
+    if isinstance(data, dict):
+        data = list(data.values())
+    return [Product.from_dict(p) for p in (data or [])]
+
+
+def encode_products(products: List[Product]) -> List[dict]:
+    return [p.to_dict() for p in products]
+
+
+def decode_tickets(data) -> Dict[str, Ticket]:
+    if not isinstance(data, dict):
+        raise ValidationError("tickets must be an object")
+    return {str(cid): Ticket.from_dict(t) for cid, t in data.items()}
+
+
+def encode_tickets(tickets: Dict[str, Ticket]) -> dict:
+    return {cid: t.to_dict() for cid, t in tickets.items()}
@@ -0,0 +1,87 @@
+import discord
+from typing import Callable, Optional
+
+
+# ------------------------------------------------------------
+# Paginated embed view
+# ------------------------------------------------------------
+class EmbedPaginator(discord.ui.View):
+    """
+    Previous/next buttons over a lazily rendered list of pages.
+    `render(page)` is only called for the page that is actually shown.
+    """
+
+    def __init__(self,
+                 render: Callable[[int], discord.Embed],
+                 page_count: int,
+                 owner_id: Optional[int] = None,
+                 timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.render = render
+        self.page_count = max(1, page_count)
+        self.owner_id = owner_id
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def current(self) -> discord.Embed:
+        embed = self.render(self.page)
+        if self.page_count > 1:
+            embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+        return embed
+
+    def _sync_buttons(self):
+        self.prev_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.owner_id is None or interaction.user.id == self.owner_id:
+            return True
+        await interaction.response.send_message("❌ These buttons are not for you.", ephemeral=True)
+        return False
+
+    async def _show(self, interaction: discord.Interaction):
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.current(), view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page_count - 1, self.page + 1)
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except Exception:
+            pass
+
+
+async def send_paginated(interaction: discord.Interaction,
+                         render: Callable[[int], discord.Embed],
+                         page_count: int,
+                         ephemeral: bool = False):
+    """
+    Sends the first page of a paginated embed. Buttons are only attached if there is more than one page.
+    Works for both fresh and deferred interactions.
+    """
+    view = EmbedPaginator(render, page_count, owner_id=interaction.user.id)
+    embed = view.current()
+
+    kwargs = {"embed": embed, "ephemeral": ephemeral}
+    if view.page_count > 1:
+        kwargs["view"] = view
+
+    if interaction.response.is_done():
+        view.message = await interaction.followup.send(wait=True, **kwargs)
+    else:
+        await interaction.response.send_message(**kwargs)
+        view.message = await interaction.original_response()
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from utils.data import load_json
+from utils.ledger import ledger
+from utils.models import Config
+
+# Local file the stub provider reads: {"<order_id or channel_id>": "<method>" | {"method": ..., "reference": ...}}
+STUB_FILE = "data/stub_payments.json"
+# Secret for the HTTP provider (kept out of data/config.json)
+API_TOKEN_ENV = "PAYMENT_API_TOKEN"
+
+# Adaptive polling: a fresh checkout is checked every MIN_INTERVAL seconds, each check that finds
+# nothing doubles its interval up to MAX_INTERVAL. Provider errors back off all orders the same way.
+MIN_INTERVAL = 15
+MAX_INTERVAL = 5 * 60
+ERROR_BACKOFF_MAX = 10 * 60
+# Provider requests in flight at once, and HTTP connections kept open for them
+MAX_CONCURRENCY = 4
+REQUEST_TIMEOUT = 15
+
+
+@dataclass(slots=True)
+class PaymentStatus:
+    order_id: str
+    paid: bool
+    method: Optional[str] = None
+    reference: Optional[str] = None
+
+
+# channel id, status -> None; called once per order the provider reports as paid
+PaidHandler = Callable[[int, PaymentStatus], Awaitable[None]]
+
+
+# ------------------------------------------------------------
+# Providers
+# ------------------------------------------------------------
+class PaymentProvider(ABC):
+    """
+    Looks up the payment state of open orders. check() gets a batch of at most `max_batch`
+    orders (ledger open-order dicts plus "channel_id") and returns a status for every order
+    it knows about; orders missing from the result count as unpaid.
+    """
+
+    name = "provider"
+    max_batch = 50
+
+    @abstractmethod
+    async def check(self, orders: List[dict]) -> Dict[str, PaymentStatus]:
+        ...
+
+    async def close(self):
+        pass
+
+
+class StubProvider(PaymentProvider):
+    """
+    Local stand-in for a payment API: an order counts as paid once its order id (or its
+    ticket channel id) appears in data/stub_payments.json. Edit the file to simulate a payment.
+    """
+
+    name = "stub"
+
+    def __init__(self, path: str = STUB_FILE):
+        self.path = path
+        self.calls = 0
+
+    async def check(self, orders: List[dict]) -> Dict[str, PaymentStatus]:
+        self.calls += 1
+        paid = load_json(self.path)
+        out = {}
+        for order in orders:
+            entry = paid.get(order["order_id"], paid.get(str(order["channel_id"])))
+            if entry is None:
+                continue
+            if not isinstance(entry, dict):
+                entry = {"method": entry}
+            out[order["order_id"]] = PaymentStatus(order["order_id"], True, entry.get("method"), entry.get("reference"))
+        return out
+
+
+class HttpProvider(PaymentProvider):
+    """
+    Payment API reached over HTTP. One pooled aiohttp session is shared by every batch, so
+    connections are reused instead of opened per check.
+
+    Request:  POST <url>  {"orders": [{"order_id", "channel_id", "total_cents", "methods"}, ...]}
+    Response: {"orders": [{"order_id", "paid", "method", "reference"}, ...]}
+    """
+
+    name = "http"
+
+    def __init__(self, url: str, token: Optional[str] = None, max_batch: int = 50):
+        self.url = url
+        self.token = token
+        self.max_batch = max_batch
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # created lazily: a ClientSession must be made inside the running loop
+        if self._session is None or self._session.closed:
+            headers = {"Authorization": f"Bearer {self.token}"} if self.token else None
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MAX_CONCURRENCY, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                headers=headers,
+            )
+        return self._session
+
+    async def check(self, orders: List[dict]) -> Dict[str, PaymentStatus]:
+        body = {"orders": [{
+            "order_id": order["order_id"],
+            "channel_id": order["channel_id"],
+            "total_cents": order["total"],
+            "methods": order["methods"],
+        } for order in orders]}
+        async with self.session.post(self.url, json=body) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        out = {}
+        for item in data.get("orders", []):
+            order_id = str(item.get("order_id"))
+            out[order_id] = PaymentStatus(order_id, bool(item.get("paid")), item.get("method"), item.get("reference"))
+        return out
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def build_provider(cfg: Config) -> Optional[PaymentProvider]:
+    """Provider named by `payment_provider` in data/config.json, or None when polling is off."""
+    if cfg.payment_provider == "stub":
+        return StubProvider()
+    if cfg.payment_provider == "http":
+        if not cfg.payment_api_url:
+            print("payment_provider is 'http' but payment_api_url is not set; payment polling is off")
+            return None
+        return HttpProvider(cfg.payment_api_url, os.getenv(API_TOKEN_ENV))
+    return None
+
+
+# ------------------------------------------------------------
+# Poller
+# ------------------------------------------------------------
+class _Schedule:
+    __slots__ = ("next_at", "interval")
+
+    def __init__(self, now: float):
+        self.next_at = now
+        self.interval = MIN_INTERVAL
+
+
+class PaymentPoller:
+    """
+    Checks every open order (ledger checkout not yet paid or closed) against a provider in the
+    background and calls `on_paid` for each one that has been paid.
+
+    Each order keeps its own interval, doubling while nothing changes, so long-unpaid tickets
+    are checked rarely and new checkouts often. Orders due in the same tick are sent in batches
+    of `provider.max_batch`, at most MAX_CONCURRENCY batches at a time; with N open orders a
+    tick costs ceil(due / max_batch) requests rather than N.
+    """
+
+    def __init__(self, provider: PaymentProvider, on_paid: PaidHandler):
+        self.provider = provider
+        self.on_paid = on_paid
+        self.schedule: Dict[str, _Schedule] = {}
+        self.failures = 0
+        self.requests = 0
+        self.found = 0
+        self._limit = asyncio.Semaphore(MAX_CONCURRENCY)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.provider.close()
+
+    async def _run(self):
+        while True:
+            try:
+                delay = await self.poll()
+            except Exception as e:
+                print(f"Payment poller error: {e}")
+                delay = MIN_INTERVAL
+            await asyncio.sleep(delay)
+
+    # ----------------------------
+    # Checking
+    # ----------------------------
+    async def poll(self) -> float:
+        """Checks every order that is due. Returns seconds until the next check."""
+        now = time.time()
+        orders = {}
+        for channel_id, order in ledger.open_orders().items():
+            orders[order["order_id"]] = dict(order, channel_id=int(channel_id))
+        # forget orders that were paid, closed or superseded by a new checkout
+        for order_id in [oid for oid in self.schedule if oid not in orders]:
+            del self.schedule[order_id]
+        for order_id in orders:
+            if order_id not in self.schedule:
+                self.schedule[order_id] = _Schedule(now)
+
+        due = [orders[oid] for oid, entry in self.schedule.items() if entry.next_at <= now]
+        if due:
+            size = max(1, self.provider.max_batch)
+            await asyncio.gather(*(self._check_batch(due[i:i + size]) for i in range(0, len(due), size)))
+
+        # new checkouts show up in the ledger at any time, so never sleep past MIN_INTERVAL
+        soonest = min((entry.next_at for entry in self.schedule.values()), default=now + MIN_INTERVAL)
+        return min(MIN_INTERVAL, max(1.0, soonest - time.time()))
+
+    async def check_now(self, channel_id: int) -> Optional[PaymentStatus]:
+        """Checks one ticket's open order right away (e.g. /ticket_checkpayment). None if it has none."""
+        order = ledger.open_order(channel_id)
+        if order is None:
+            return None
+        order["channel_id"] = int(channel_id)
+        results = await self._check_batch([order])
+        if results is None:
+            raise ConnectionError(f"Payment provider {self.provider.name} did not answer")
+        return results.get(order["order_id"], PaymentStatus(order["order_id"], False))
+
+    async def _check_batch(self, batch: List[dict]) -> Optional[Dict[str, PaymentStatus]]:
+        """Checks one batch and acts on the results. None if the provider failed."""
+        async with self._limit:
+            self.requests += 1
+            try:
+                results = await self.provider.check(batch)
+            except Exception as e:
+                self.failures += 1
+                backoff = min(ERROR_BACKOFF_MAX, MIN_INTERVAL * 2 ** self.failures)
+                print(f"Payment provider {self.provider.name} failed on {len(batch)} order(s): {e}")
+                for order in batch:
+                    self._reschedule(order["order_id"], backoff)
+                return None
+        self.failures = 0
+
+        for order in batch:
+            order_id = order["order_id"]
+            status = results.get(order_id)
+            if status is None or not status.paid:
+                entry = self.schedule.get(order_id)
+                interval = min(MAX_INTERVAL, entry.interval * 2) if entry else MIN_INTERVAL
+                self._reschedule(order_id, interval)
+                continue
+            self.schedule.pop(order_id, None)
+            self.found += 1
+            try:
+                await self.on_paid(order["channel_id"], status)
+            except Exception as e:
+                print(f"Marking order {order_id} paid failed: {e}")
+        return results
+
+    def _reschedule(self, order_id: str, interval: float):
+        entry = self.schedule.get(order_id)
+        if entry is None:
+            return
+        entry.interval = interval
+        # jitter keeps orders created together from staying in lockstep
+        entry.next_at = time.time() + interval * random.uniform(0.9, 1.1)
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.provider.name,
+            "open": len(self.schedule),
+            "requests": self.requests,
+            "found": self.found,
+            "failures": self.failures,
+        }
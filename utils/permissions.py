@@ -1,14 +1,16 @@
 import discord
 from discord import app_commands
 from utils.data import load_json
+from utils.models import Config
+from utils.guilds import allowed_guilds
 
 CONFIG_FILE = "data/config.json"
 
 # ------------------------------------------------------------
 # Load config helper
 # ------------------------------------------------------------
-def get_config():
-    return load_json(CONFIG_FILE)
+def get_config() -> Config:
+    return Config.from_dict(load_json(CONFIG_FILE))
 
 
 # ------------------------------------------------------------
@@ -16,7 +18,7 @@ def get_config():
 # ------------------------------------------------------------
 async def is_owner(interaction: discord.Interaction) -> bool:
     config = get_config()
-    owner_id = config.get("owner_id")
+    owner_id = config.owner_id
 
     return interaction.user.id == owner_id
 
@@ -28,10 +30,10 @@ async def is_staff(interaction: discord.Interaction) -> bool:
     config = get_config()
 
     # Owner bypass
-    if interaction.user.id == config.get("owner_id"):
+    if interaction.user.id == config.owner_id:
         return True
 
-    staff_roles = config.get("staff_roles", [])
+    staff_roles = config.staff_roles
 
     # Check if member has any staff role
     if any(role.id in staff_roles for role in interaction.user.roles):
@@ -44,14 +46,8 @@ async def is_staff(interaction: discord.Interaction) -> bool:
 # GUILD WHITELIST CHECK
 # ------------------------------------------------------------
 async def in_allowed_guild(interaction: discord.Interaction) -> bool:
-    config = get_config()
-    allowed = config.get("allowed_guilds")
-
-    # If no whitelist defined, allow everywhere
-    if not allowed:
-        return True
-
-    return interaction.guild_id in allowed
+    # set lookup only; the list is kept current by utils.guilds
+    return interaction.guild_id in allowed_guilds
 
 
 # ------------------------------------------------------------
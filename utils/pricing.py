@@ -0,0 +1,133 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.data import load_json
+from utils.locks import file_signature
+from utils.models import CartLine, Config, Product, Ticket, decode_products, to_cents
+
+PRODUCTS_FILE = "data/products.json"
+DISCOUNTS_FILE = "data/discounts.json"
+CONFIG_FILE = "config.json"   # discount codes live in the project-level config
+
+
+# ------------------------------------------------------------
+# Money helpers (prices are handled as integer cents internally)
+# ------------------------------------------------------------
+def money(cents: int) -> str:
+    return f"${cents / 100:.2f}"
+
+
+def parse_code(rule) -> Optional[Tuple[str, int]]:
+    """
+    Normalizes a discount code entry from config.json.
+    {"percent": 10} -> ("percent", 10), {"amount": 5} -> ("amount", 500 cents).
+    A bare number is treated as a percent (older configs).
+    """
+    if isinstance(rule, (int, float)):
+        return ("percent", max(0, min(100, int(rule))))
+    if not isinstance(rule, dict):
+        return None
+    if "percent" in rule:
+        return ("percent", max(0, min(100, int(rule["percent"]))))
+    if "amount" in rule:
+        return ("amount", max(0, to_cents(rule["amount"])))
+    return None
+
+
+class Quote:
+    """Result of pricing one cart."""
+    __slots__ = ("lines", "subtotal", "discount", "total", "payment_methods", "code")
+
+    def __init__(self, lines, subtotal, discount, total, payment_methods, code):
+        self.lines = lines                      # [CartLine]
+        self.subtotal = subtotal                # after per-product discounts
+        self.discount = discount                # code + ticket discounts
+        self.total = total
+        self.payment_methods = payment_methods
+        self.code = code
+
+
+# ------------------------------------------------------------
+# Compiled price book
+# ------------------------------------------------------------
+class PriceBook:
+    """
+    All discount sources folded into one evaluator:
+    - product["discount_percent"] is baked into each product's unit price at compile time
+    - config.json discount_codes are normalized into (kind, value) rules
+    - data/discounts.json per-channel amounts (legacy) are kept as a lookup table
+
+    A PriceBook is built once per catalog version; quote() is a single pass over the cart.
+    """
+
+    def __init__(self, products: List[Product], codes: dict, channel_discounts: dict):
+        self.units: Dict[str, tuple] = {}
+        for p in products:
+            unit = p.price_cents * (100 - p.discount_percent) // 100
+            self.units[str(p.id)] = (p.name, unit, p.discount_percent, tuple(p.payment_methods))
+
+        self.codes: Dict[str, Tuple[str, int]] = {}
+        for code, rule in (codes or {}).items():
+            parsed = parse_code(rule)
+            if parsed:
+                self.codes[code.upper()] = parsed
+
+        self.channel_discounts = {str(k): to_cents(v) for k, v in (channel_discounts or {}).items()}
+
+    def has_code(self, code: str) -> bool:
+        return bool(code) and code.upper() in self.codes
+
+    def quote(self, cart: dict, ticket: Optional[Ticket] = None, channel_id=None) -> Quote:
+        lines = []
+        subtotal = 0
+        methods = set()
+        for pid, amount in cart.items():
+            unit = self.units.get(str(pid))
+            if unit is None:
+                continue
+            name, cents, percent, pay = unit
+            line = CartLine(str(pid), name, amount, cents, percent)
+            subtotal += line.line_cents
+            methods.update(pay)
+            lines.append(line)
+
+        discount = 0
+        code = None
+        if ticket:
+            code = ticket.discount_code
+            rule = self.codes.get(code.upper()) if code else None
+            if rule:
+                kind, value = rule
+                discount += subtotal * value // 100 if kind == "percent" else value
+            discount += ticket.discount_cents
+        if channel_id is not None:
+            discount += self.channel_discounts.get(str(channel_id), 0)
+
+        discount = min(discount, subtotal)
+        return Quote(lines, subtotal, discount, subtotal - discount, sorted(methods), code)
+
+
+_book: Optional[PriceBook] = None
+_book_sig = None
+_book_lock = threading.Lock()
+
+
+def get_pricebook() -> PriceBook:
+    """
+    Returns the compiled price book, recompiling only when products.json, config.json
+    or discounts.json changed since the last compile.
+    """
+    global _book, _book_sig
+    sig = tuple(file_signature(path) for path in (PRODUCTS_FILE, CONFIG_FILE, DISCOUNTS_FILE))
+    with _book_lock:
+        if _book is None or sig != _book_sig:
+            config = Config.from_dict(load_json(CONFIG_FILE))
+            _book = PriceBook(decode_products(load_json(PRODUCTS_FILE)), config.discount_codes, load_json(DISCOUNTS_FILE))
+            _book_sig = sig
+        return _book
+
+
+def invalidate_pricebook():
+    global _book
+    with _book_lock:
+        _book = None
@@ -0,0 +1,161 @@
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.models import Product
+
+# Fields that are indexed and how much a match in each is worth
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "description": 1.0,
+}
+
+# Prefix matches count for a bit less than a whole-word match
+PREFIX_PENALTY = 0.6
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# ------------------------------------------------------------
+# Tokenizer
+# ------------------------------------------------------------
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases the text and splits it into alphanumeric tokens.
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+# ------------------------------------------------------------
+# Inverted index
+# ------------------------------------------------------------
+class SearchIndex:
+    """
+    In-memory inverted index over product name and description.
+
+    postings maps token -> {product_id: weighted term frequency}.
+    A sorted copy of the vocabulary is kept for prefix lookups and is
+    only rebuilt when a token is added or disappears. records keeps the
+    indexed Product itself, so results render without rereading the catalog.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_tokens: Dict[int, Dict[str, float]] = {}
+        self.records: Dict[int, Product] = {}
+        self._vocab: List[str] = []
+        self._vocab_dirty = False
+        self.loaded = False
+        self.signature = None     # products.json signature at the last build (multi-worker mode)
+
+    def __len__(self):
+        return len(self.doc_tokens)
+
+    # ----------------------------
+    # Building / incremental updates
+    # ----------------------------
+    def build(self, products: Iterable[Product]):
+        self.postings.clear()
+        self.doc_tokens.clear()
+        self.records.clear()
+        # clear() drops tokens without marking the vocabulary stale, so force a re-sort
+        self._vocab = []
+        self._vocab_dirty = True
+        for product in products:
+            self.upsert(product)
+        self.loaded = True
+
+    def upsert(self, product: Product):
+        """
+        Index (or re-index) a single product. Only the postings for this product are touched.
+        """
+        product_id = product.id
+        self.remove(product_id)
+
+        weights: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(product, field, "")):
+                weights[token] = weights.get(token, 0.0) + weight
+
+        for token, weight in weights.items():
+            bucket = self.postings.get(token)
+            if bucket is None:
+                bucket = self.postings[token] = {}
+                self._vocab_dirty = True
+            bucket[product_id] = weight
+        self.doc_tokens[product_id] = weights
+        self.records[product_id] = product
+
+    def remove(self, product_id: int):
+        self.records.pop(product_id, None)
+        weights = self.doc_tokens.pop(product_id, None)
+        if not weights:
+            return
+        for token in weights:
+            bucket = self.postings.get(token)
+            if bucket is None:
+                continue
+            bucket.pop(product_id, None)
+            if not bucket:
+                del self.postings[token]
+                self._vocab_dirty = True
+
+    # ----------------------------
+    # Querying
+    # ----------------------------
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """
+        Returns the vocabulary tokens matching `term` exactly or by prefix, with their match factor.
+        """
+        if self._vocab_dirty:
+            self._vocab = sorted(self.postings)
+            self._vocab_dirty = False
+
+        matches = []
+        i = bisect_left(self._vocab, term)
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            token = self._vocab[i]
+            matches.append((token, 1.0 if token == term else PREFIX_PENALTY))
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Ranks products against the query and returns [(product_id, score)] best first.
+        Every query term must match (exactly or as a prefix) for a product to be returned.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        total_docs = max(len(self.doc_tokens), 1)
+        scores: Optional[Dict[int, float]] = None
+
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for token, factor in self._expand(term):
+                bucket = self.postings.get(token)
+                if not bucket:
+                    continue
+                idf = math.log(1 + total_docs / len(bucket))
+                for product_id, weight in bucket.items():
+                    score = weight * idf * factor
+                    if score > term_scores.get(product_id, 0.0):
+                        term_scores[product_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+# Shared index used by the product cog
+product_index = SearchIndex()
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.data import load_json, save_json
+from utils.locks import file_lock
+
+DATA_DIR = "data"
+SNAPSHOT_DIR = "snapshots"
+
+# Content-defined chunking parameters (bytes)
+MIN_CHUNK = 2 * 1024
+AVG_CHUNK_BITS = 13          # ~8 KiB average chunk
+MAX_CHUNK = 64 * 1024
+
+# Files that are never part of a snapshot (save_json's temporary files)
+SKIP_SUFFIXES = (".tmp",)
+
+# Fixed pseudo-random table for the gear rolling hash; must never change or chunk boundaries move
+_GEAR = [random.Random(0x5EED + i).getrandbits(32) for i in range(256)]
+# Test the high bits: they depend on the last 32 bytes, the low bits only on the last few
+_MASK = ((1 << AVG_CHUNK_BITS) - 1) << (32 - AVG_CHUNK_BITS)
+
+
+# ------------------------------------------------------------
+# Chunking
+# ------------------------------------------------------------
+def chunk_boundaries(data: bytes) -> Iterator[bytes]:
+    """
+    Splits data where a gear rolling hash hits a fixed bit pattern, so an edit only changes
+    the chunks around it and the rest of the file dedups against the previous snapshot.
+    """
+    n = len(data)
+    start = 0
+    while start < n:
+        end = min(start + MAX_CHUNK, n)
+        if end - start <= MIN_CHUNK:
+            yield data[start:end]
+            return
+        h = 0
+        cut = end
+        for i in range(start + MIN_CHUNK, end):
+            h = ((h << 1) + _GEAR[data[i]]) & 0xFFFFFFFF
+            if not h & _MASK:
+                cut = i + 1
+                break
+        yield data[start:cut]
+        start = cut
+
+
+# ------------------------------------------------------------
+# Snapshot store
+# ------------------------------------------------------------
+class SnapshotStore:
+    """
+    Deduplicated snapshots of the data directory.
+
+    snapshots/chunks/ab/<sha256>     content-addressed chunks, written once
+    snapshots/manifests/<id>.json    file -> size, mtime, sha256 and chunk list
+
+    Files whose size and mtime match the previous snapshot reuse its chunk list without being
+    read, and only chunks that are not stored yet are written, so both time and space scale
+    with what changed rather than with the size of data/.
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR, source: str = DATA_DIR):
+        self.root = root
+        self.source = source
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self._lock = threading.Lock()
+
+    def chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.manifest_dir, f"{snapshot_id}.json")
+
+    def list_snapshots(self) -> List[str]:
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.manifest_dir) if name.endswith(".json"))
+
+    def load_manifest(self, snapshot_id: str) -> Optional[dict]:
+        manifest = load_json(self.manifest_path(snapshot_id))
+        return manifest or None
+
+    def _iter_source_files(self) -> Iterator[str]:
+        for folder, _, files in os.walk(self.source):
+            for name in files:
+                if name.endswith(SKIP_SUFFIXES):
+                    continue
+                path = os.path.join(folder, name)
+                yield os.path.relpath(path, self.source).replace(os.sep, "/")
+
+    def _store_chunk(self, chunk: bytes) -> Tuple[str, bool]:
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return digest, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(chunk)
+        os.replace(tmp, path)
+        return digest, True
+
+    # ----------------------------
+    # Taking snapshots
+    # ----------------------------
+    def take(self) -> dict:
+        """Takes an incremental snapshot and returns a summary of what it cost."""
+        with self._lock:
+            started = time.time()
+            snapshots = self.list_snapshots()
+            previous = self.load_manifest(snapshots[-1]) if snapshots else None
+            prev_files: Dict[str, dict] = previous["files"] if previous else {}
+
+            files = {}
+            changed: List[Tuple[str, int, bytes]] = []
+            stats = {"files": 0, "unchanged": 0, "new_chunks": 0, "new_bytes": 0, "total_bytes": 0}
+            # Read under the journal lock, so no multi-file Transaction is half-applied while we
+            # read. journal.log is kept: one left by a crash is replayed by recover_journal()
+            # when a restored folder is started.
+            with file_lock("journal"):
+                for rel in self._iter_source_files():
+                    path = os.path.join(self.source, rel)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    stats["files"] += 1
+                    stats["total_bytes"] += st.st_size
+
+                    old = prev_files.get(rel)
+                    if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                        files[rel] = old
+                        stats["unchanged"] += 1
+                        continue
+
+                    try:
+                        with open(path, "rb") as f:
+                            changed.append((rel, st.st_mtime_ns, f.read()))
+                    except OSError:
+                        continue
+
+            # chunking and hashing happen after the lock is released
+            for rel, mtime_ns, data in changed:
+                chunks = []
+                for chunk in chunk_boundaries(data):
+                    digest, created = self._store_chunk(chunk)
+                    chunks.append(digest)
+                    if created:
+                        stats["new_chunks"] += 1
+                        stats["new_bytes"] += len(chunk)
+                files[rel] = {
+                    "size": len(data),
+                    "mtime_ns": mtime_ns,
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "chunks": chunks,
+                }
+
+            snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.gmtime(started))
+            if snapshot_id in snapshots:
+                snapshot_id += f"-{len(snapshots)}"
+            save_json(self.manifest_path(snapshot_id), {"id": snapshot_id, "created": started, "files": files})
+
+            stats["id"] = snapshot_id
+            stats["seconds"] = round(time.time() - started, 3)
+            return stats
+
+    # ----------------------------
+    # Verification / restore
+    # ----------------------------
+    def _read_file(self, entry: dict) -> bytes:
+        parts = []
+        for digest in entry["chunks"]:
+            with open(self.chunk_path(digest), "rb") as f:
+                parts.append(f.read())
+        return b"".join(parts)
+
+    def verify(self, snapshot_id: str) -> List[str]:
+        """Re-hashes every chunk and file of a snapshot. Returns a list of problems (empty = OK)."""
+        manifest = self.load_manifest(snapshot_id)
+        if manifest is None:
+            return [f"snapshot {snapshot_id} not found"]
+
+        problems = []
+        checked = set()
+        for rel, entry in manifest["files"].items():
+            try:
+                for digest in entry["chunks"]:
+                    if digest in checked:
+                        continue
+                    with open(self.chunk_path(digest), "rb") as f:
+                        if hashlib.sha256(f.read()).hexdigest() != digest:
+                            problems.append(f"{rel}: chunk {digest[:12]} is corrupt")
+                    checked.add(digest)
+                if hashlib.sha256(self._read_file(entry)).hexdigest() != entry["sha256"]:
+                    problems.append(f"{rel}: content hash mismatch")
+            except FileNotFoundError:
+                problems.append(f"{rel}: missing chunk")
+        return problems
+
+    def restore(self, snapshot_id: str, target: str):
+        """
+        Rebuilds the data directory as it was at `snapshot_id` into `target`.
+        Meant to be run with the bot stopped (see tools/snapshots.py). If the snapshot holds a
+        journal.log, the interrupted commit is finished when the bot starts on the restored folder.
+        """
+        manifest = self.load_manifest(snapshot_id)
+        if manifest is None:
+            raise FileNotFoundError(f"snapshot {snapshot_id} not found")
+
+        for rel, entry in manifest["files"].items():
+            data = self._read_file(entry)
+            if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                raise ValueError(f"{rel}: content hash mismatch, snapshot is damaged")
+            path = os.path.join(target, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+
+# Shared store used by the backup cog
+snapshot_store = SnapshotStore()
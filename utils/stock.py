@@ -0,0 +1,249 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from utils.data import load_json, save_json
+from utils.locks import file_lock, file_signature, shared_mode
+
+PRODUCTS_FILE = "data/products.json"
+RESERVATIONS_FILE = "data/reservations.json"
+
+# How long a checkout keeps its items on hold if nobody configured otherwise
+DEFAULT_HOLD_MINUTES = 15
+
+
+def products_lock():
+    """
+    Lock for any read-modify-write of products.json. flush() writes the stock counters into the
+    same file, so product commands take the engine's "stock" lock rather than one of their own.
+    """
+    return file_lock("stock")
+
+
+# ------------------------------------------------------------
+# Stock reservation engine
+# ------------------------------------------------------------
+class StockEngine:
+    """
+    Keeps per-product stock counters in memory and hands out time-limited holds per ticket.
+
+    stock[pid] is the committed on-hand amount (None = unlimited), held[pid] is the sum of
+    all active holds. Every mutation happens under one lock and is all-or-nothing, so two
+    checkouts can never both take the last item. Counters are written back to products.json
+    in batches by flush(); holds are persisted alongside so they survive a restart.
+
+    With several worker processes (utils/locks.py) every call also takes the "stock" file lock,
+    reloads if another worker wrote since our last look, and flushes before releasing it.
+    """
+
+    def __init__(self, products_file: str = PRODUCTS_FILE, reservations_file: str = RESERVATIONS_FILE):
+        self.products_file = products_file
+        self.reservations_file = reservations_file
+        self._lock = threading.RLock()
+        self.stock: Dict[str, Optional[int]] = {}
+        self.held: Dict[str, int] = {}
+        self.holds: Dict[str, dict] = {}
+        self._dirty_stock = set()
+        self._dirty_holds = False
+        self._seen = None
+        self.loaded = False
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            products = load_json(self.products_file)
+            if isinstance(products, dict):
+                products = list(products.values())
+            for p in products or []:
+                self.stock[str(p.get("id"))] = p.get("stock")
+
+            saved = load_json(self.reservations_file)
+            for key, hold in saved.items():
+                items = {str(pid): int(qty) for pid, qty in hold.get("items", {}).items()}
+                self.holds[key] = {"items": items, "expires": float(hold.get("expires", 0))}
+                for pid, qty in items.items():
+                    self.held[pid] = self.held.get(pid, 0) + qty
+            self._seen = self._signature()
+            self.loaded = True
+
+    def _signature(self):
+        return file_signature(self.products_file), file_signature(self.reservations_file)
+
+    @contextmanager
+    def _synced(self):
+        with self._lock:
+            if not shared_mode():
+                yield
+                return
+            with file_lock("stock"):
+                if self._signature() != self._seen:
+                    # another worker changed stock or holds; nothing of ours is unflushed here
+                    self.stock.clear()
+                    self.held.clear()
+                    self.holds.clear()
+                    self.loaded = False
+                    self.ensure_loaded()
+                yield
+                self.flush()
+
+    def track(self, product_id, stock: Optional[int]):
+        """Registers a new product (or a stock value written by someone else) without marking it dirty."""
+        self.ensure_loaded()
+        with self._synced():
+            self.stock[str(product_id)] = stock
+
+    def forget(self, product_id):
+        self.ensure_loaded()
+        with self._synced():
+            self.stock.pop(str(product_id), None)
+            self._dirty_stock.discard(str(product_id))
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def available(self, product_id) -> Optional[int]:
+        """Units that can still be reserved. None means unlimited."""
+        self.ensure_loaded()
+        pid = str(product_id)
+        with self._synced():
+            stock = self.stock.get(pid)
+            if stock is None:
+                return None
+            return stock - self.held.get(pid, 0)
+
+    def hold_for(self, key) -> Optional[dict]:
+        self.ensure_loaded()
+        with self._synced():
+            hold = self.holds.get(str(key))
+            return dict(hold) if hold else None
+
+    # ----------------------------
+    # Mutations
+    # ----------------------------
+    def _drop_hold(self, key: str) -> Optional[dict]:
+        hold = self.holds.pop(key, None)
+        if not hold:
+            return None
+        for pid, qty in hold["items"].items():
+            left = self.held.get(pid, 0) - qty
+            if left > 0:
+                self.held[pid] = left
+            else:
+                self.held.pop(pid, None)
+        self._dirty_holds = True
+        return hold
+
+    def reserve(self, key, items: Dict[str, int], ttl_seconds: float) -> Tuple[bool, List[Tuple[str, int, int]]]:
+        """
+        Holds every item in `items` for `key` (a ticket channel id), replacing any previous hold.
+        All-or-nothing: returns (False, [(product_id, wanted, available), ...]) if any item is short,
+        in which case the previous hold is left untouched.
+        """
+        self.ensure_loaded()
+        key = str(key)
+        wanted = {str(pid): int(qty) for pid, qty in items.items() if int(qty) > 0}
+
+        with self._synced():
+            previous = self.holds.get(key, {}).get("items", {})
+            shortages = []
+            for pid, qty in wanted.items():
+                stock = self.stock.get(pid)
+                if stock is None:
+                    continue
+                free = stock - self.held.get(pid, 0) + previous.get(pid, 0)
+                if qty > free:
+                    shortages.append((pid, qty, max(0, free)))
+            if shortages:
+                return False, shortages
+
+            self._drop_hold(key)
+            # only limited products need to be held
+            limited = {pid: qty for pid, qty in wanted.items() if self.stock.get(pid) is not None}
+            self.holds[key] = {"items": limited, "expires": time.time() + ttl_seconds}
+            for pid, qty in limited.items():
+                self.held[pid] = self.held.get(pid, 0) + qty
+            self._dirty_holds = True
+            return True, []
+
+    def release(self, key) -> bool:
+        """Gives the items held for `key` back to the pool."""
+        self.ensure_loaded()
+        with self._synced():
+            return self._drop_hold(str(key)) is not None
+
+    def commit(self, key) -> Optional[Dict[str, int]]:
+        """
+        Turns the hold for `key` into a sale: the held units are taken out of stock.
+        Returns the committed items, or None if there was no active hold.
+        """
+        self.ensure_loaded()
+        with self._synced():
+            hold = self._drop_hold(str(key))
+            if hold is None:
+                return None
+            for pid, qty in hold["items"].items():
+                stock = self.stock.get(pid)
+                if stock is None:
+                    continue
+                self.stock[pid] = stock - qty
+                self._dirty_stock.add(pid)
+            return hold["items"]
+
+    def set_stock(self, product_id, stock: Optional[int]):
+        """Staff override of the on-hand amount. Active holds stay in place."""
+        self.ensure_loaded()
+        with self._synced():
+            pid = str(product_id)
+            self.stock[pid] = stock
+            self._dirty_stock.add(pid)
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Releases every hold past its expiry and returns their keys."""
+        self.ensure_loaded()
+        now = time.time() if now is None else now
+        with self._synced():
+            expired = [key for key, hold in self.holds.items() if hold["expires"] <= now]
+            for key in expired:
+                self._drop_hold(key)
+            return expired
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def flush(self):
+        """
+        Writes changed counters back to products.json and the hold table to reservations.json.
+        Does nothing if nothing changed since the last flush.
+        """
+        with self._lock, products_lock():
+            if not self.loaded or (not self._dirty_stock and not self._dirty_holds):
+                return
+            dirty = {pid: self.stock.get(pid) for pid in self._dirty_stock}
+            holds = {key: {"items": dict(h["items"]), "expires": h["expires"]} for key, h in self.holds.items()}
+            write_holds = self._dirty_holds
+            self._dirty_stock.clear()
+            self._dirty_holds = False
+
+            if dirty:
+                products = load_json(self.products_file)
+                if isinstance(products, dict):
+                    products = list(products.values())
+                for p in products or []:
+                    pid = str(p.get("id"))
+                    if pid in dirty:
+                        p["stock"] = dirty[pid]
+                save_json(self.products_file, products or [])
+            if write_holds:
+                save_json(self.reservations_file, holds)
+            self._seen = self._signature()
+
+
+# Shared engine used by the cart, product and ticket cogs
+stock_engine = StockEngine()